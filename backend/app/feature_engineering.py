@@ -1,7 +1,15 @@
+import os
+import sys
 import pandas as pd
 from pathlib import Path
 from data_cleaning import build_cleaned_merged
 
+# Make backend/ importable when run as a script from app/
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_processing.feature_store import write_features
+from data_processing.feature_kernel import series_features
+from data_processing.rollups import build_rollups
+
 # --- Define project root (one level above "app") ---
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
@@ -12,9 +20,10 @@ PROCESSED_PATH.mkdir(parents=True, exist_ok=True)
 
 def build_feature_engineered_csv() -> Path:
     """
-    Generate feature_engineered.csv from cleaned_merged.csv
+    Generate the processed feature dataset from cleaned_merged.csv
     adding time-based, lag, rolling and derived metrics.
-    The file is guaranteed to be saved in the 'data/processed' folder.
+    The Parquet dataset is saved under 'data/processed/feature_engineered',
+    partitioned by region and resource_type.
     """
     cleaned_path = INTERIM_PATH / "cleaned_merged.csv"
     if not cleaned_path.exists():
@@ -33,18 +42,8 @@ def build_feature_engineered_csv() -> Path:
     cleaned["quarter"] = cleaned["date"].dt.quarter
     cleaned["is_weekend"] = cleaned["day_of_week"].isin([5, 6]).astype(int)
 
-    # --- Lag & rolling CPU features per region ---
-    cleaned.sort_values(["region", "date"], inplace=True)
-    for lag in [1, 3, 7]:
-        cleaned[f"cpu_lag_{lag}"] = cleaned.groupby("region")["usage_cpu"].shift(lag)
-    for window in [7, 30]:
-        cleaned[f"cpu_roll_mean_{window}"] = cleaned.groupby("region")["usage_cpu"].transform(
-            lambda s: s.rolling(window, min_periods=1).mean()
-        )
-    for stat in ["max", "min"]:
-        cleaned[f"cpu_roll_{stat}_7"] = cleaned.groupby("region")["usage_cpu"].transform(
-            lambda s: getattr(s.rolling(7, min_periods=1), stat)()
-        )
+    # --- Lag & rolling CPU features per (region, resource_type) series ---
+    cleaned = series_features(cleaned, ["region", "resource_type"], min_periods=1)
 
     # --- Derived metrics using daily totals ---
     daily_totals = daily.set_index("date")[["usage_cpu", "usage_storage"]].rename(
@@ -55,11 +54,11 @@ def build_feature_engineered_csv() -> Path:
     cleaned["storage_efficiency"] = cleaned["usage_storage"] / cleaned["storage_allocated"].replace(0, pd.NA)
 
     # --- Save processed dataset ---
-    out_path = PROCESSED_PATH / "feature_engineered.csv"
-    cleaned.to_csv(out_path, index=False)
+    out_path = write_features(cleaned, PROCESSED_PATH / "feature_engineered")
+    build_rollups()
 
     # --- Debugging info ---
-    print(f"Feature-engineered CSV saved to: {out_path}")
+    print(f"Feature-engineered dataset saved to: {out_path}")
     print(f"Data shape: {cleaned.shape}")
 
     return out_path
@@ -0,0 +1,76 @@
+# benchmarks/lstm_forecast.py
+# Compare the ring-buffer LSTM forecaster (on the Keras model and on its NumPy export)
+# with the previous predict + pd.concat loop.
+# Run from backend/: python -m benchmarks.lstm_forecast [--horizon 365]
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler
+from config import TARGET, WINDOW, LSTM_FEATURES
+from data_processing.dataset import get_dataset
+from models.forecast import lstm_future
+from models.registry import get_model
+
+
+def predict_loop(model, scaler, df, horizon):
+    """The per-step model.predict implementation lstm_future replaced."""
+    df_copy = df.copy()
+    future_rows = []
+    for _ in range(horizon):
+        X_seq = df_copy[-WINDOW:][LSTM_FEATURES]
+        X_scaled = scaler.transform(X_seq)
+        X_input = X_scaled.reshape(1, WINDOW, len(LSTM_FEATURES))
+
+        y_pred = model.predict(X_input, verbose=0)[0][0]
+        next_date = df_copy["date"].max() + pd.Timedelta(days=1)
+
+        new_row = df_copy.iloc[-1][LSTM_FEATURES].to_dict()
+        new_row["date"] = next_date
+        new_row[TARGET] = y_pred
+
+        df_copy = pd.concat([df_copy, pd.DataFrame([new_row])], ignore_index=True)
+        future_rows.append((next_date, y_pred))
+    return future_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recursive LSTM forecaster")
+    parser.add_argument("--horizon", type=int, default=365)
+    args = parser.parse_args()
+
+    df = get_dataset()
+    first = df[["region", "resource_type"]].dropna().iloc[0]
+    series = df[(df["region"] == first["region"]) & (df["resource_type"] == first["resource_type"])]
+    series = series.sort_values("date").dropna().reset_index(drop=True)
+    model = get_model("lstm")
+    exported = get_model("lstm_numpy")
+    scaler = MinMaxScaler().fit(series[LSTM_FEATURES])
+
+    # Warm both paths (tracing / predict function setup) before timing
+    list(lstm_future(model, scaler, series, 2))
+    list(lstm_future(exported, scaler, series, 2))
+    predict_loop(model, scaler, series, 2)
+
+    start = time.perf_counter()
+    expected = predict_loop(model, scaler, series, args.horizon)
+    t_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = list(lstm_future(model, scaler, series, args.horizon))
+    t_ring = time.perf_counter() - start
+    start = time.perf_counter()
+    actual_numpy = list(lstm_future(exported, scaler, series, args.horizon))
+    t_numpy = time.perf_counter() - start
+
+    for result in (actual, actual_numpy):
+        assert [d for d, _ in result] == [d for d, _ in expected]
+        np.testing.assert_allclose([y for _, y in result], [y for _, y in expected], rtol=1e-4)
+
+    print(f"{first['region']} / {first['resource_type']}, horizon {args.horizon}")
+    print(f"  predict + concat loop:    {t_loop:8.3f}s ({t_loop / args.horizon * 1e3:7.3f} ms/step)")
+    print(f"  ring buffer + tf.function:{t_ring:8.3f}s ({t_ring / args.horizon * 1e3:7.3f} ms/step)")
+    print(f"  ring buffer + NumPy:      {t_numpy:8.3f}s ({t_numpy / args.horizon * 1e3:7.3f} ms/step)")
+    print(f"  speed-up:                 {t_loop / t_ring:8.1f}x / {t_loop / t_numpy:.1f}x (predictions match)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# benchmarks/xgboost_forecast.py
+# Compare the recursive XGBoost engine with the previous one-row DataFrame loop.
+# Run from backend/: python -m benchmarks.xgboost_forecast [--horizon 365]
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import MinMaxScaler, LabelEncoder
+from config import TARGET
+from data_processing.dataset import get_dataset
+from data_processing.schema import model_columns
+from models.forecast import xgboost_future, xgboost_features
+from models.registry import get_model
+
+
+def dataframe_loop(model, scaler, encoders, df, horizon):
+    """The per-step DataFrame implementation xgboost_future replaced (features copied forward)."""
+    last_row = df.iloc[-1]
+    future_rows = []
+    for _ in range(horizon):
+        next_date = last_row["date"] + pd.Timedelta(days=1)
+        input_row = last_row.copy()
+        input_row["date"] = next_date
+        input_df = pd.DataFrame([input_row])
+        for col in model_columns(input_df):
+            if col in encoders:
+                input_df[col] = encoders[col].transform(input_df[col].astype(str))
+        X_input = input_df.reindex(columns=xgboost_features(model)).astype("float64")
+        y_pred = model.predict(scaler.transform(X_input))[0]
+
+        df = pd.concat([df, pd.DataFrame([{"date": next_date, TARGET: y_pred}])], ignore_index=True)
+        last_row = df.iloc[-1]
+        future_rows.append((next_date, y_pred))
+    return future_rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the recursive XGBoost forecaster")
+    parser.add_argument("--horizon", type=int, default=365)
+    args = parser.parse_args()
+
+    df = get_dataset()
+    first = df[["region", "resource_type"]].dropna().iloc[0]
+    series = df[(df["region"] == first["region"]) & (df["resource_type"] == first["resource_type"])]
+    series = series.sort_values("date").reset_index(drop=True)
+    model = get_model("xgboost")
+
+    encoders = {}
+    encoded = series.copy()
+    for col in model_columns(encoded):
+        encoders[col] = LabelEncoder()
+        encoded[col] = encoders[col].fit_transform(encoded[col].astype(str))
+    X = encoded.reindex(columns=xgboost_features(model)).astype("float64")
+    scaler = MinMaxScaler().fit(X)
+
+    start = time.perf_counter()
+    dataframe_loop(model, scaler, encoders, series, args.horizon)
+    t_loop = time.perf_counter() - start
+    start = time.perf_counter()
+    future = list(xgboost_future(model, scaler, X, series[TARGET], series["date"].max(), args.horizon))
+    t_engine = time.perf_counter() - start
+    assert len(future) == args.horizon and np.isfinite([y for _, y in future]).all()
+
+    print(f"{first['region']} / {first['resource_type']}, horizon {args.horizon}")
+    print(f"  DataFrame loop:   {t_loop:8.3f}s ({t_loop / args.horizon * 1e3:7.3f} ms/step)")
+    print(f"  recursive engine: {t_engine:8.3f}s ({t_engine / args.horizon * 1e3:7.3f} ms/step)")
+    print(f"  speed-up:         {t_loop / t_engine:8.1f}x")
+
+if __name__ == "__main__":
+    main()
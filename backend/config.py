@@ -9,14 +9,61 @@ INTERIM_DIR = DATA_DIR / "interim"
 PROCESSED_DIR = DATA_DIR / "processed"
 
 FEATURE_FILE = PROCESSED_DIR / "feature_engineered.csv"
+FEATURE_DATASET_DIR = PROCESSED_DIR / "feature_engineered"
+ROLLUP_FILE = PROCESSED_DIR / "insight_rollups.json"
+FEATURE_STATE_FILE = PROCESSED_DIR / "feature_state.json"
+# Precomputed forecasts written by the scheduled job (models/forecast_db.py)
+FORECAST_DB = DATA_DIR / "outputs" / "forecasts.db"
 
 # config.py
 
-DATA_PATH = "data/processed/feature_engineered.csv"
 MODEL_PATH_LSTM = "models/lstm_model.h5"
+# NumPy export of the LSTM (models/lstm_numpy.py), and which of the two serves forecasts:
+# "numpy" keeps TensorFlow out of the API process, "keras" runs the .h5 model
+MODEL_PATH_LSTM_NPZ = "models/lstm_model.npz"
+LSTM_BACKEND = "numpy"
+# Weight storage for the NumPy export written after training ("float32" or "float16")
+LSTM_EXPORT_DTYPE = "float32"
 MODEL_PATH_XGB = "models/xgboost_model.pkl"
+MODEL_PATH_XGB_DIRECT = "models/xgboost_direct.pkl"
 TARGET = "usage_cpu"
 WINDOW = 30
+# Longest horizon the direct (one model, horizon as a feature) XGBoost strategy is trained for
+DIRECT_HORIZON = 30
+# ARIMA: default order (until a search has picked one per series), and appended
+# observations after which a series is fully refitted
+ARIMA_ORDER = (5, 1, 0)
+ARIMA_REFIT_AFTER = 30
+ARIMA_STATE_DIR = BASE_DIR / "models" / "arima_state"
+# Fast AR tier (models/batch_ar.py): AR order p on the d-times differenced series
+BATCH_AR_ORDER = (7, 1)
+# Order search bounds (models/arima_orders.py): p and q up to these, d up to ARIMA_MAX_D
+ARIMA_MAX_P = 5
+ARIMA_MAX_D = 1
+ARIMA_MAX_Q = 2
+# Forecast result cache (models/forecast_cache.py): entries kept, and seconds an entry stays valid
+FORECAST_CACHE_SIZE = 256
+FORECAST_CACHE_TTL = 3600
+# Days ahead the scheduled job stores; covers every horizon the dashboard offers
+STORED_FORECAST_HORIZON = 90
+# Scheduled forecast pool (models/forecast_jobs.py): processes (None = cores - 1),
+# concurrent tasks per model (others up to the pool size), threads per worker process
+FORECAST_WORKERS = None
+MODEL_CONCURRENCY = {"lstm": 1, "xgboost": 2}
+WORKER_THREADS = 1
+# Threads running on-demand model work for the API (utils/model_executor.py)
+MODEL_EXECUTOR_WORKERS = 2
+
+# Inputs of the recursive XGBoost model, in training order, for model files saved
+# without feature names (newer ones carry feature_names_in_)
+XGBOOST_FEATURES = [
+  'region', 'resource_type', 'usage_storage', 'users_active',
+  'day_of_week', 'month', 'quarter', 'is_weekend',
+  'utilization_ratio', 'storage_efficiency',
+  'cpu_lag_1', 'cpu_lag_3', 'cpu_lag_7',
+  'cpu_roll_mean_7', 'cpu_roll_mean_30',
+  'cpu_roll_max_7', 'cpu_roll_min_7'
+]
 
 LSTM_FEATURES = [
   'usage_storage', 'users_active', 'utilization_ratio',
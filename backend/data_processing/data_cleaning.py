@@ -1,22 +1,90 @@
+import hashlib
 import pandas as pd
 from config import RAW_DIR, INTERIM_DIR
 
-def load_and_clean_raw(filename: str):
-    path = RAW_DIR / filename
-    df = pd.read_csv(path)
-    
+CHUNK_ROWS = 100_000
+REQUIRED_COLUMNS = ['date', 'region', 'resource_type', 'usage_cpu', 'usage_storage']
+SERIES_KEYS = ['region', 'resource_type']
+
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
     # Drop completely empty rows
     df = df.dropna(how="all")
-    
+
     # Ensure date is datetime
     df['date'] = pd.to_datetime(df['date'], errors='coerce')
     df = df.dropna(subset=['date'])
-    
+
     # Fill missing region with "Unknown"
     df['region'] = df['region'].fillna("Unknown")
-    
+    return df
+
+
+def load_and_clean_raw(filename: str):
+    path = RAW_DIR / filename
+    df = _clean(pd.read_csv(path))
+
     # Save interim cleaned file
     INTERIM_DIR.mkdir(parents=True, exist_ok=True)
     df.to_csv(INTERIM_DIR / filename, index=False)
-    
+
     return df
+
+
+def iter_clean_raw_chunks(filename: str, chunksize: int = CHUNK_ROWS):
+    """
+    Clean a raw CSV `chunksize` rows at a time, appending each cleaned chunk to the
+    interim file as it goes. Yields (rows_read, cleaned_chunk) so memory stays bounded
+    by the chunk size rather than the file size.
+    """
+    path = RAW_DIR / filename
+    INTERIM_DIR.mkdir(parents=True, exist_ok=True)
+    interim = INTERIM_DIR / filename
+
+    with pd.read_csv(path, chunksize=chunksize) as reader:
+        for i, chunk in enumerate(reader):
+            rows_read = len(chunk)
+            missing = [c for c in REQUIRED_COLUMNS if c not in chunk.columns]
+            if missing:
+                raise ValueError(f"{filename} is missing required columns: {', '.join(missing)}")
+            chunk = _clean(chunk)
+            chunk.to_csv(interim, mode="w" if i == 0 else "a", header=i == 0, index=False)
+            yield rows_read, chunk
+
+
+def read_interim(filename: str, chunksize: int = None):
+    """The cleaned interim file written by iter_clean_raw_chunks: one frame, or a chunk reader when chunksize is set."""
+    return pd.read_csv(INTERIM_DIR / filename, parse_dates=['date'], chunksize=chunksize)
+
+
+def _series_file(directory, region, resource_type):
+    # Hashed names: region/resource labels may hold characters that are not valid in file names
+    name = hashlib.sha1(f"{region}|{resource_type}".encode()).hexdigest()
+    return directory / f"{name}.csv"
+
+
+def spill_series(chunk: pd.DataFrame, directory):
+    """Append the rows of a cleaned chunk to one CSV per (region, resource_type) under directory."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for (region, resource_type), rows in chunk.groupby(SERIES_KEYS, dropna=False, sort=False, observed=True):
+        path = _series_file(directory, region, resource_type)
+        rows.to_csv(path, mode="a", header=not path.exists(), index=False)
+
+
+def iter_series(directory, float_columns=(), rows: int = CHUNK_ROWS):
+    """
+    Yield the series written by spill_series, whole series at a time, batched into frames
+    of about `rows` rows (one series longer than that is a frame of its own). Columns
+    that were float in any chunk are read as float in every series, so frames share dtypes.
+    """
+    dtypes = {col: "float64" for col in float_columns}
+    batch, size = [], 0
+    for path in sorted(directory.glob("*.csv")):
+        series = pd.read_csv(path, parse_dates=['date'], dtype=dtypes)
+        if batch and size + len(series) > rows:
+            yield pd.concat(batch, ignore_index=True)
+            batch, size = [], 0
+        batch.append(series)
+        size += len(series)
+    if batch:
+        yield pd.concat(batch, ignore_index=True)
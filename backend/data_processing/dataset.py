@@ -0,0 +1,101 @@
+import hashlib
+import threading
+import pandas as pd
+from config import FEATURE_FILE, FEATURE_DATASET_DIR
+from data_processing.feature_store import has_feature_dataset, dataset_files, read_features
+from data_processing.feature_index import SeriesIndex
+from data_processing.schema import apply_schema
+
+# Shared, in-process copy of the processed feature set.
+# Loaded once with dates parsed and reloaded only when the source files change;
+# the version is tracked separately so checking it never loads rows.
+_lock = threading.Lock()
+_state = {
+    "frame": None,
+    "frame_version": None,
+    "index": None,
+    "parquet": False,
+    "signature": None,
+    "version": None,
+}
+
+
+def _content_hash(paths) -> str:
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(path.name.encode())
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _manifest_hash(paths) -> str:
+    # Parquet parts are write-once with unique names, so name + size identifies their content
+    digest = hashlib.sha1()
+    for path in paths:
+        digest.update(f"{path.relative_to(FEATURE_DATASET_DIR)}:{path.stat().st_size}".encode())
+    return digest.hexdigest()
+
+
+def _load(parquet: bool) -> pd.DataFrame:
+    if parquet:
+        return read_features()
+    return apply_schema(pd.read_csv(FEATURE_FILE, parse_dates=["date"]))
+
+
+def _refresh():
+    """Recompute the dataset version when the source files change (does not load any rows)."""
+    parquet = has_feature_dataset()
+    paths = dataset_files() if parquet else [FEATURE_FILE]
+    signature = tuple((str(p), p.stat().st_mtime_ns, p.stat().st_size) for p in paths)
+    if signature == _state["signature"]:
+        return
+
+    _state["parquet"] = parquet
+    _state["version"] = _manifest_hash(paths) if parquet else _content_hash(paths)
+    _state["signature"] = signature
+
+
+def _current_frame():
+    _refresh()
+    if _state["frame"] is None or _state["frame_version"] != _state["version"]:
+        _state["frame"] = _load(_state["parquet"])
+        _state["frame_version"] = _state["version"]
+        _state["index"] = None
+    return _state["frame"]
+
+
+def get_dataset() -> pd.DataFrame:
+    """
+    Return a shallow copy of the shared processed feature set.
+    Callers may add, replace or drop columns, but must not modify values in place
+    (df.loc[...] = ..., inplace=True, writes into to_numpy() arrays): the column
+    buffers are shared with every other caller. Take df.copy() before mutating.
+    Raises FileNotFoundError if the features have not been built yet.
+    """
+    with _lock:
+        frame = _current_frame()
+    return frame.copy(deep=False)
+
+
+def get_index() -> SeriesIndex:
+    """(region, resource_type, date) index over the current feature set, rebuilt once per version."""
+    with _lock:
+        frame = _current_frame()
+        if _state["index"] is None:
+            _state["index"] = SeriesIndex(frame)
+        return _state["index"]
+
+
+def dataset_version() -> str:
+    """Content hash of the current feature set (file manifest for the Parquet store); cheap to call."""
+    with _lock:
+        _refresh()
+        return _state["version"]
+
+
+def invalidate():
+    """Drop the cached frame so the next call reloads from disk."""
+    with _lock:
+        _state.update(frame=None, frame_version=None, index=None, signature=None, version=None)
@@ -1,54 +1,216 @@
+import json
 import pandas as pd
-from config import INTERIM_DIR, PROCESSED_DIR, FEATURE_FILE
+from config import FEATURE_STATE_FILE
+from data_processing.dataset import get_dataset, dataset_version
+from data_processing.feature_store import write_features, write_feature_parts, append_features, has_feature_dataset, feature_columns
+from data_processing.rollups import build_rollups, update_rollups, add_rollups, save_rollups
+from data_processing.feature_kernel import series_features, ROLLING
 
-def create_features(df: pd.DataFrame):
-    # --- Ensure date is datetime ---
-    if df['date'].dtype != 'datetime64[ns]':
-        df['date'] = pd.to_datetime(df['date'])
+SERIES_KEYS = ['region', 'resource_type']
+LAGS = [1, 3, 7]
+DIFF_COLUMNS = ['usage_cpu', 'usage_storage', 'users_active']
+# Longest look-back of any feature (cpu_roll_mean_30); this many trailing rows per series are carried over
+STATE_WINDOW = 30
 
-    # --- Time-based features ---
+
+def _add_time_features(df):
     df['day_of_week'] = df['date'].dt.dayofweek
     df['month'] = df['date'].dt.month
     df['quarter'] = df['date'].dt.quarter
     df['is_weekend'] = df['day_of_week'].isin([5,6])
+    return df
 
-    # --- Derived metrics ---
+
+def _add_derived_metrics(df, cpu_max=None, storage_max=None):
     # CPU utilization ratio
     if 'cpu_total' in df.columns and 'usage_cpu' in df.columns:
         df['utilization_ratio'] = df['usage_cpu'] / df['cpu_total'].replace({0:1})
     else:
-        df['utilization_ratio'] = df['usage_cpu'] / df['usage_cpu'].max()
+        df['utilization_ratio'] = df['usage_cpu'] / (cpu_max or df['usage_cpu'].max())
 
     # Storage efficiency
     if 'storage_allocated' in df.columns and 'usage_storage' in df.columns:
         df['storage_efficiency'] = df['usage_storage'] / df['storage_allocated'].replace({0:1})
     else:
-        df['storage_efficiency'] = df['usage_storage'] / df['usage_storage'].max()
+        df['storage_efficiency'] = df['usage_storage'] / (storage_max or df['usage_storage'].max())
+    return df
 
-    # --- Sort for time-based calculations ---
-    df = df.sort_values(['region','date'])
 
-    # --- Lag features ---
-    for lag in [1,3,7]:
-        df[f'cpu_lag_{lag}'] = df.groupby('region')['usage_cpu'].shift(lag)
+def _running_max(previous, values):
+    """Larger of a stored maximum and the new values' maximum, skipping whichever is missing (None if both are)."""
+    current = values.max()
+    candidates = [v for v in (previous, current) if v is not None and pd.notna(v)]
+    return float(max(candidates)) if candidates else None
 
-    # --- Daily change features ---
-    for col in ['usage_cpu', 'usage_storage', 'users_active']:
-        if col in df.columns:
-            df[f'{col}_daily'] = df.groupby('region')[col].diff()
 
-    # --- Rolling features ---
-    df['cpu_roll_mean_7'] = df.groupby('region')['usage_cpu'].transform(lambda x: x.rolling(7).mean())
-    df['cpu_roll_mean_30'] = df.groupby('region')['usage_cpu'].transform(lambda x: x.rolling(30).mean())
-    df['cpu_roll_max_7'] = df.groupby('region')['usage_cpu'].transform(lambda x: x.rolling(7).max())
-    df['cpu_roll_min_7'] = df.groupby('region')['usage_cpu'].transform(lambda x: x.rolling(7).min())
+def _add_series_features(df):
+    """Lag, daily-change and rolling features per (region, resource_type) series, in one vectorized pass."""
+    return series_features(df, SERIES_KEYS, lags=LAGS, diff_columns=DIFF_COLUMNS, rolling=ROLLING)
 
-    # --- Save processed CSV ---
-    PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
-    df.to_csv(FEATURE_FILE, index=False)
+
+def _engineer(df, cpu_max=None, storage_max=None):
+    # --- Ensure date is datetime ---
+    if df['date'].dtype != 'datetime64[ns]':
+        df['date'] = pd.to_datetime(df['date'])
+
+    # --- Time-based features ---
+    df = _add_time_features(df)
+
+    # --- Derived metrics ---
+    df = _add_derived_metrics(df, cpu_max, storage_max)
+
+    # --- Lag / daily change / rolling features ---
+    return _add_series_features(df)
+
+
+def create_features(df: pd.DataFrame):
+    df = _engineer(df)
+
+    # --- Save processed dataset (Parquet, partitioned by region/resource_type) ---
+    write_features(df)
+    _save_state(_state_from_frame(df))
+
+    # --- Materialise insight aggregates for the new dataset ---
+    build_rollups()
 
     return df
 
+
+def create_features_by_series(frames, cpu_max, storage_max) -> int:
+    """
+    Rebuild the feature set from an iterable of frames that each hold whole series
+    (data_cleaning.iter_series), one frame in memory at a time; returns the rows written.
+    Ratios are normalised by the maxima over all the data, which the caller gathers
+    while cleaning, so the result matches create_features on the concatenated frames.
+    """
+    state = {"cpu_max": cpu_max, "storage_max": storage_max, "series": {}}
+    built = {"rollups": None, "rows": 0}
+
+    def engineered():
+        for df in frames:
+            df = _engineer(df, cpu_max, storage_max)
+            state["series"].update(_state_from_frame(df)["series"])
+            built["rollups"] = add_rollups(built["rollups"], df)
+            built["rows"] += len(df)
+            yield df
+
+    write_feature_parts(engineered())
+    _save_state(state)
+    save_rollups(built["rollups"])
+    return built["rows"]
+
+
+# ------------------------------
+# Incremental (append-only) mode
+# ------------------------------
+def _state_from_frame(df):
+    """Trailing STATE_WINDOW rows of every series plus the normalisation maxima."""
+    cols = ['date'] + [c for c in DIFF_COLUMNS if c in df.columns]
+    tails = df.sort_values(SERIES_KEYS + ['date'], kind='mergesort').groupby(SERIES_KEYS, sort=False, observed=True).tail(STATE_WINDOW)
+    series = {}
+    for (region, resource_type), tail in tails.groupby(SERIES_KEYS, sort=False, observed=True):
+        rows = tail[cols].copy()
+        rows['date'] = rows['date'].dt.strftime('%Y-%m-%d')
+        series[f"{region}|{resource_type}"] = {
+            "region": str(region),
+            "resource_type": str(resource_type),
+            "tail": rows.astype(object).where(rows.notna(), None).to_dict(orient="list"),
+        }
+    return {
+        "cpu_max": float(df['usage_cpu'].max()) if 'usage_cpu' in df.columns else None,
+        "storage_max": float(df['usage_storage'].max()) if 'usage_storage' in df.columns else None,
+        "series": series,
+    }
+
+
+def _save_state(state):
+    state["dataset_version"] = dataset_version()
+    FEATURE_STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = FEATURE_STATE_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+    tmp.replace(FEATURE_STATE_FILE)
+
+
+def _load_state():
+    """Carried-over state; rebuilt from the stored features if missing or out of date."""
+    if FEATURE_STATE_FILE.exists():
+        with open(FEATURE_STATE_FILE) as f:
+            state = json.load(f)
+        if state.get("dataset_version") == dataset_version():
+            return state
+    return _state_from_frame(get_dataset())
+
+
+def _context_frame(state, keys):
+    frames = []
+    for key in keys:
+        entry = state["series"].get(key)
+        if entry is None:
+            continue
+        context = pd.DataFrame(entry["tail"])
+        context['region'] = entry["region"]
+        context['resource_type'] = entry["resource_type"]
+        frames.append(context)
+    if not frames:
+        return pd.DataFrame(columns=['date'] + SERIES_KEYS)
+    context = pd.concat(frames, ignore_index=True)
+    context['date'] = pd.to_datetime(context['date'])
+    return context
+
+
+def create_features_incremental(df: pd.DataFrame):
+    """
+    Engineer features only for rows newer than what is already stored, using the carried-over
+    trailing window of each series, and append them to the feature store.
+    Ratios normalised by a running maximum (no cpu_total / storage_allocated columns) use the
+    maximum seen so far; already-stored rows are not renormalised.
+    """
+    df = df.copy()
+    if df['date'].dtype != 'datetime64[ns]':
+        df['date'] = pd.to_datetime(df['date'])
+    if not has_feature_dataset():
+        # Move a legacy CSV feature set into the Parquet store before appending to it
+        write_features(get_dataset())
+
+    state = _load_state()
+    keys = df['region'].astype(str) + "|" + df['resource_type'].astype(str)
+
+    # --- Append-only: keep rows after each series' last stored day ---
+    last_dates = {k: s["tail"]["date"][-1] for k, s in state["series"].items() if s["tail"]["date"]}
+    cutoff = pd.to_datetime(keys.map(last_dates))
+    df = df[(cutoff.isna() | (df['date'] > cutoff)).to_numpy()]
+    if df.empty:
+        return df
+
+    # --- Time-based features and derived metrics, against running maxima ---
+    cpu_max = _running_max(state.get("cpu_max"), df['usage_cpu'])
+    storage_max = _running_max(state.get("storage_max"), df['usage_storage'])
+    df = _add_time_features(df)
+    df = _add_derived_metrics(df, cpu_max, storage_max)
+
+    # --- Series features over carried-over tail + new rows ---
+    context = _context_frame(state, keys[df.index].unique())
+    context['_context'] = True
+    df['_context'] = False
+    combined = _add_series_features(pd.concat([context, df], ignore_index=True))
+    new_rows = combined[~combined['_context'].astype(bool)].drop(columns='_context')
+
+    stored_columns = feature_columns()
+    new_rows = new_rows.reindex(columns=stored_columns)
+    for col in ['day_of_week', 'month', 'quarter']:
+        new_rows[col] = new_rows[col].astype('int64')
+    append_features(new_rows)
+
+    # --- Carry the new trailing window forward ---
+    updated = _state_from_frame(combined.drop(columns='_context'))
+    state["series"].update(updated["series"])
+    state["cpu_max"], state["storage_max"] = cpu_max, storage_max
+    _save_state(state)
+
+    update_rollups(new_rows)
+    return new_rows
+
+
 def load_features():
-    df = pd.read_csv(FEATURE_FILE, parse_dates=['date'])
-    return df
+    return get_dataset()
@@ -0,0 +1,163 @@
+import base64
+import json
+from bisect import bisect_left
+import numpy as np
+import pandas as pd
+
+SERIES_KEYS = ["region", "resource_type"]
+
+
+class SeriesIndex:
+    """
+    Processed features sorted by (region, resource_type, date) with precomputed
+    segment offsets, so a series + date-range lookup is a dict hit plus two
+    binary searches instead of several full-column scans.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        frame = df.sort_values(SERIES_KEYS + ["date"], kind="mergesort").reset_index(drop=True)
+        self.frame = frame
+        self.dates = frame["date"].to_numpy(dtype="datetime64[ns]").view("i8")
+
+        regions = frame["region"].to_numpy()
+        resource_types = frame["resource_type"].to_numpy()
+        n = len(frame)
+        if n:
+            changed = (regions[1:] != regions[:-1]) | (resource_types[1:] != resource_types[:-1])
+            starts = np.concatenate([[0], np.flatnonzero(changed) + 1])
+        else:
+            starts = np.array([], dtype=int)
+        stops = np.append(starts[1:], n)
+
+        # (region, resource_type) -> (start, stop) row offsets into self.frame
+        self.segments = {
+            (regions[a], resource_types[a]): (int(a), int(b)) for a, b in zip(starts, stops)
+        }
+        self._segment_keys = list(self.segments)
+        self._segment_starts = [a for a, _ in self.segments.values()]
+        self._counts = {}
+        self._regions_lower = {}
+        for region, _ in self.segments:
+            self._regions_lower.setdefault(str(region).strip().lower(), set()).add(region)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def series(self):
+        return list(self.segments)
+
+    def _match_segments(self, region, resource_type, ignore_case):
+        if region:
+            regions = self._regions_lower.get(region.strip().lower(), set()) if ignore_case else {region}
+        else:
+            regions = None
+
+        if regions is not None and resource_type:
+            keys = [(r, resource_type) for r in sorted(regions)]
+            return [self.segments[k] for k in keys if k in self.segments]
+        return [
+            bounds for (r, t), bounds in self.segments.items()
+            if (regions is None or r in regions) and (not resource_type or t == resource_type)
+        ]
+
+    def slices(self, region=None, resource_type=None, start_date=None, end_date=None, ignore_case=False):
+        """Contiguous (start, stop) row ranges matching the filters, in index order."""
+        lo_key = pd.Timestamp(start_date).value if start_date else None
+        hi_key = pd.Timestamp(end_date).value if end_date else None
+
+        ranges = []
+        for start, stop in self._match_segments(region, resource_type, ignore_case):
+            dates = self.dates[start:stop]
+            lo = start + int(np.searchsorted(dates, lo_key, side="left")) if lo_key is not None else start
+            hi = start + int(np.searchsorted(dates, hi_key, side="right")) if hi_key is not None else stop
+            if hi > lo:
+                ranges.append((lo, hi))
+        return ranges
+
+    def query(self, region=None, resource_type=None, start_date=None, end_date=None, columns=None, ignore_case=False) -> pd.DataFrame:
+        ranges = self.slices(region, resource_type, start_date, end_date, ignore_case)
+        frame = self.frame[list(columns)] if columns else self.frame
+        if len(ranges) == 1:
+            rows = frame.iloc[ranges[0][0]:ranges[0][1]].copy()
+        else:
+            positions = np.concatenate([np.arange(a, b) for a, b in ranges]) if ranges else np.array([], dtype=int)
+            rows = frame.iloc[positions]
+        return rows.reset_index(drop=True)
+
+    def count(self, region=None, resource_type=None, start_date=None, end_date=None, ignore_case=False) -> int:
+        return sum(b - a for a, b in self.slices(region, resource_type, start_date, end_date, ignore_case))
+
+    def count_cached(self, region=None, resource_type=None, start_date=None, end_date=None, ignore_case=False) -> int:
+        """count() memoised for the lifetime of this index (i.e. one dataset version)."""
+        key = (region, resource_type, start_date, end_date, ignore_case)
+        if key not in self._counts:
+            self._counts[key] = self.count(region, resource_type, start_date, end_date, ignore_case)
+        return self._counts[key]
+
+    # --- Keyset pagination ---
+
+    def key_at(self, pos):
+        return (self.frame["region"].iat[pos], self.frame["resource_type"].iat[pos], int(self.dates[pos]))
+
+    def position_after(self, key) -> int:
+        """First row position strictly after (region, resource_type, date_ns) in index order."""
+        region, resource_type, date_ns = key
+        i = bisect_left(self._segment_keys, (region, resource_type))
+        if i < len(self._segment_keys) and self._segment_keys[i] == (region, resource_type):
+            start, stop = self.segments[(region, resource_type)]
+            return start + int(np.searchsorted(self.dates[start:stop], date_ns, side="right"))
+        return self._segment_starts[i] if i < len(self._segment_starts) else len(self.frame)
+
+    def page_after(self, cursor_key, limit, region=None, resource_type=None, start_date=None,
+                   end_date=None, columns=None, ignore_case=False):
+        """
+        Up to `limit` matching rows after cursor_key (None = first page) and the key of the
+        last row returned, or None when nothing follows. Cost depends on the page size, not its depth.
+        """
+        pos = self.position_after(cursor_key) if cursor_key else 0
+        positions = []
+        remaining = limit + 1  # one extra row tells us whether another page exists
+        for start, stop in self.slices(region, resource_type, start_date, end_date, ignore_case):
+            if stop <= pos:
+                continue
+            start = max(start, pos)
+            take = min(stop - start, remaining)
+            positions.append(np.arange(start, start + take))
+            remaining -= take
+            if not remaining:
+                break
+
+        positions = np.concatenate(positions) if positions else np.array([], dtype=int)
+        has_more = len(positions) > limit
+        positions = positions[:limit]
+        next_key = self.key_at(positions[-1]) if has_more else None
+
+        frame = self.frame[list(columns)] if columns else self.frame
+        return frame.iloc[positions].reset_index(drop=True), next_key
+
+
+def encode_cursor(key) -> str:
+    region, resource_type, date_ns = key
+    raw = json.dumps([str(region), str(resource_type), int(date_ns)]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str):
+    """Inverse of encode_cursor; raises ValueError for malformed tokens."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        region, resource_type, date_ns = json.loads(raw)
+        return str(region), str(resource_type), int(date_ns)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+
+def cursor_page(index: SeriesIndex, cursor: str, limit: int, **query):
+    """
+    One keyset page for an opaque cursor token ("" = first page): the rows from
+    index.page_after and the token for the next page, or None after the last one.
+    Raises ValueError for malformed tokens.
+    """
+    after = decode_cursor(cursor) if cursor else None
+    page, next_key = index.page_after(after, limit, **query)
+    return page, encode_cursor(next_key) if next_key else None
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Segmented feature kernel.
+# Rows are sorted once by series key + date so every series is a contiguous
+# segment; lags, diffs and rolling windows are then computed over the whole
+# column at once and masked where they would reach into the previous segment.
+
+# Rolling CPU statistics as (stat, window), in output column order
+ROLLING = [("mean", 7), ("mean", 30), ("max", 7), ("min", 7)]
+
+
+def sort_segments(df: pd.DataFrame, keys, order="date"):
+    """Sort by keys + order and return (sorted frame, segment start offsets)."""
+    df = df.sort_values(list(keys) + [order], kind="mergesort")
+    n = len(df)
+    if not n:
+        return df, np.array([], dtype=np.int64)
+    changed = np.zeros(n, dtype=bool)
+    changed[0] = True
+    for key in keys:
+        values = df[key].to_numpy()
+        changed[1:] |= values[1:] != values[:-1]
+    # Rows with a missing key are never grouped together (groupby drops them)
+    changed |= _missing_keys(df, keys)
+    return df, np.flatnonzero(changed)
+
+
+def _missing_keys(df, keys):
+    return df[list(keys)].isna().any(axis=1).to_numpy()
+
+
+def _segment_positions(starts, n):
+    """(row position within its segment, segment start of each row)."""
+    lengths = np.diff(np.append(starts, n))
+    row_start = np.repeat(starts, lengths)
+    return np.arange(n) - row_start, row_start
+
+
+def _lag(values, pos, k):
+    out = np.full(len(values), np.nan)
+    if k < len(values):
+        out[k:] = values[:len(values) - k]
+    out[pos < k] = np.nan
+    return out
+
+
+def _rolling(values, pos, row_start, window, stats, min_periods):
+    """{stat: rolling stat} over trailing windows clipped to each row's segment."""
+    n = len(values)
+    if not n:
+        return {stat: np.empty(0) for stat in stats}
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+
+    # Valid-value count per window, exact via integer prefix sums
+    csum = np.concatenate([[0], np.cumsum(valid)])
+    lo = np.maximum(np.arange(n) - window + 1, row_start)
+    count = csum[np.arange(n) + 1] - csum[lo]
+
+    # Full windows: strided views, no per-row copies
+    pad = window - 1
+    raw = sliding_window_view(np.concatenate([np.full(pad, np.nan), values]), window)
+    zeroed = sliding_window_view(np.concatenate([np.zeros(pad), filled]), window)
+    out = {}
+    for stat in stats:
+        if stat == "mean":
+            out[stat] = zeroed.sum(axis=1) / np.where(count > 0, count, 1)
+        elif stat == "max":
+            out[stat] = np.fmax.reduce(raw, axis=1)
+        elif stat == "min":
+            out[stat] = np.fmin.reduce(raw, axis=1)
+        else:
+            raise ValueError(f"Unsupported rolling stat: {stat}")
+
+    # Windows that would cross into the previous segment: gather and mask (at most window-1 rows per series)
+    head = np.flatnonzero(pos < pad)
+    if len(head):
+        idx = head[:, None] - np.arange(pad, -1, -1)[None, :]
+        outside = idx < row_start[head][:, None]
+        gathered = np.where(outside, np.nan, values[np.maximum(idx, 0)])
+        for stat in stats:
+            if stat == "mean":
+                out[stat][head] = np.where(np.isnan(gathered), 0.0, gathered).sum(axis=1) / np.maximum(count[head], 1)
+            elif stat == "max":
+                out[stat][head] = np.fmax.reduce(gathered, axis=1)
+            else:
+                out[stat][head] = np.fmin.reduce(gathered, axis=1)
+
+    too_few = count < (window if min_periods is None else min_periods)
+    for stat in stats:
+        out[stat][too_few] = np.nan
+    return out
+
+
+def series_features(df: pd.DataFrame, keys, lags=(1, 3, 7), diff_columns=(), rolling=ROLLING,
+                    source="usage_cpu", prefix="cpu", min_periods=None) -> pd.DataFrame:
+    """
+    Add {prefix}_lag_{k}, {col}_daily and {prefix}_roll_{stat}_{window} columns per series
+    in one pass. Matches groupby(keys).shift / diff / rolling(window, min_periods); the
+    returned frame is sorted by keys + date.
+    """
+    df, starts = sort_segments(df, keys)
+    n = len(df)
+    pos, row_start = _segment_positions(starts, n)
+    values = df[source].to_numpy(dtype="float64")
+
+    new = {}
+    for k in lags:
+        new[f"{prefix}_lag_{k}"] = _lag(values, pos, k)
+
+    for col in diff_columns:
+        if col in df.columns:
+            col_values = values if col == source else df[col].to_numpy(dtype="float64")
+            new[f"{col}_daily"] = col_values - _lag(col_values, pos, 1)
+
+    by_window = {}
+    for stat, window in rolling:
+        by_window.setdefault(window, []).append(stat)
+    computed = {
+        window: _rolling(values, pos, row_start, window, stats, min_periods)
+        for window, stats in by_window.items()
+    }
+    for stat, window in rolling:
+        new[f"{prefix}_roll_{stat}_{window}"] = computed[window][stat]
+
+    missing = _missing_keys(df, keys)
+    df = df.copy(deep=False)
+    for name, column in new.items():
+        column[missing] = np.nan
+        df[name] = column
+    return df
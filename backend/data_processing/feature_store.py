@@ -0,0 +1,186 @@
+import json
+import shutil
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from config import FEATURE_DATASET_DIR
+from data_processing.schema import apply_schema
+
+# Processed features live in a Parquet dataset partitioned as
+#   feature_engineered/region=<region>/resource_type=<resource_type>/*.parquet
+# so per-series readers only touch the files they need.
+PARTITION_COLS = ["region", "resource_type"]
+_PARTITIONING = ds.partitioning(
+    pa.schema([("region", pa.string()), ("resource_type", pa.string())]),
+    flavor="hive",
+)
+_COLUMN_ORDER_KEY = b"feature_columns"
+
+
+def _to_table(df: pd.DataFrame) -> pa.Table:
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"])
+    if "is_weekend" in df.columns:
+        df["is_weekend"] = df["is_weekend"].astype(bool)
+    for col in PARTITION_COLS:
+        df[col] = df[col].astype(str)
+    df = df.sort_values("date", kind="stable")
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_COLUMN_ORDER_KEY] = json.dumps(list(df.columns)).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def write_features(df: pd.DataFrame, path=FEATURE_DATASET_DIR):
+    """
+    Replace the processed feature dataset with df.
+    Written to a sibling directory first and swapped in, so readers never see a half-written dataset.
+    """
+    return write_feature_parts([df], path)
+
+
+def write_feature_parts(frames, path=FEATURE_DATASET_DIR):
+    """
+    Replace the processed feature dataset with the rows of an iterable of frames (e.g. one
+    per series), holding one frame in memory at a time. Every part is cast to the schema
+    of the first and staged like write_features, then swapped in.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f"{path.name}.tmp-{uuid.uuid4().hex}")
+    schema = None
+    try:
+        for df in frames:
+            table = _to_table(df)
+            if schema is None:
+                schema = table.schema
+            else:
+                table = table.select(schema.names).cast(schema)
+            pq.write_to_dataset(
+                table,
+                staging,
+                partition_cols=PARTITION_COLS,
+                basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+            )
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if schema is None:
+        raise ValueError("No feature rows to write")
+
+    retired = path.with_name(f"{path.name}.old-{uuid.uuid4().hex}")
+    if path.exists():
+        path.rename(retired)
+    staging.rename(path)
+    shutil.rmtree(retired, ignore_errors=True)
+    return path
+
+
+def append_features(df: pd.DataFrame, path=FEATURE_DATASET_DIR):
+    """
+    Add rows to the existing dataset as new files in their partitions; nothing already
+    stored is rewritten. Columns are cast to the stored schema.
+    """
+    table = _to_table(df)
+    stored = _open(path).schema
+    target = pa.schema(
+        [stored.field(name) for name in table.schema.names if name in stored.names],
+        metadata=stored.metadata,
+    )
+    table = table.select(target.names).cast(target)
+    pq.write_to_dataset(
+        table,
+        path,
+        partition_cols=PARTITION_COLS,
+        basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    return path
+
+
+def has_feature_dataset(path=FEATURE_DATASET_DIR) -> bool:
+    return path.is_dir() and any(path.rglob("*.parquet"))
+
+
+def _open(path=FEATURE_DATASET_DIR):
+    return ds.dataset(path, format="parquet", partitioning=_PARTITIONING)
+
+
+def list_series(path=FEATURE_DATASET_DIR):
+    """(region, resource_type) pairs present in the dataset, read from partition paths only."""
+    series = set()
+    for fragment in _open(path).get_fragments():
+        keys = ds.get_partition_keys(fragment.partition_expression)
+        series.add((keys["region"], keys["resource_type"]))
+    return sorted(series)
+
+
+def _match_regions(region, ignore_case):
+    if not ignore_case:
+        return [region]
+    wanted = region.strip().lower()
+    return sorted({r for r, _ in list_series() if r.strip().lower() == wanted})
+
+
+def _build_filter(region, resource_type, start_date, end_date, ignore_case):
+    expr = None
+
+    def _and(clause):
+        return clause if expr is None else expr & clause
+
+    if region:
+        expr = _and(ds.field("region").isin(_match_regions(region, ignore_case)))
+    if resource_type:
+        expr = _and(ds.field("resource_type") == resource_type)
+    if start_date:
+        expr = _and(ds.field("date") >= pd.Timestamp(start_date))
+    if end_date:
+        expr = _and(ds.field("date") <= pd.Timestamp(end_date))
+    return expr
+
+
+def feature_columns():
+    """Column names of the processed feature set, without scanning any rows."""
+    if not has_feature_dataset():
+        from data_processing.dataset import get_dataset
+        return list(get_dataset().columns)
+    schema = _open().schema
+    return json.loads(schema.metadata[_COLUMN_ORDER_KEY]) if schema.metadata else schema.names
+
+
+def read_features(
+    region=None,
+    resource_type=None,
+    start_date=None,
+    end_date=None,
+    columns=None,
+    ignore_case=False,
+) -> pd.DataFrame:
+    """
+    Read processed features, pushing region/resource_type/date predicates and the
+    column projection down to the Parquet scan. Columns come back with the in-memory
+    dtypes from data_processing.schema. Falls back to the shared in-memory
+    index over the legacy feature_engineered.csv when no Parquet dataset has been built.
+    """
+    if not has_feature_dataset():
+        from data_processing.dataset import get_index
+        return get_index().query(region, resource_type, start_date, end_date, columns, ignore_case)
+
+    dataset = _open()
+    columns = list(columns) if columns else feature_columns()
+
+    table = dataset.to_table(
+        columns=columns,
+        filter=_build_filter(region, resource_type, start_date, end_date, ignore_case),
+    )
+    df = apply_schema(table.to_pandas())
+    if "date" in df.columns:
+        df = df.sort_values("date", kind="stable").reset_index(drop=True)
+    return df
+
+
+def dataset_files(path=FEATURE_DATASET_DIR):
+    return sorted(path.rglob("*.parquet"))
@@ -1,47 +1,36 @@
 import pandas as pd
 import numpy as np
-from data_processing.feature_engineering import load_features
+from data_processing.rollups import get_rollups, region_stats, peak_days, monthly_means, correlations
+
+def _finite(value):
+    return value if value is not None and pd.notna(value) and np.isfinite(value) else None
 
 def get_insights():
-    df = load_features()
-    print("usage_cpu stats:", df["usage_cpu"].describe())
+    # All aggregates come from the rollups materialised at ingest
+    rollups = get_rollups()
 
     # --- Top regions by CPU utilization ---
-    top_regions = (
-        df.groupby('region')['utilization_ratio']
-        .mean()
-        .reset_index()
-        .sort_values('utilization_ratio', ascending=False)
+    regions = region_stats(rollups)
+    top_regions = sorted(
+        regions.items(),
+        key=lambda kv: float("-inf") if _finite(kv[1]["avg_utilization"]) is None else kv[1]["avg_utilization"],
+        reverse=True,
     )
     top_regions_list = [
-        {"region": r, "avg_utilization": u if pd.notna(u) and np.isfinite(u) else None}
-        for r, u in zip(top_regions['region'], top_regions['utilization_ratio'])
+        {"region": r, "avg_utilization": _finite(stats["avg_utilization"])}
+        for r, stats in top_regions
     ][:5]
 
     # --- Peak CPU usage days ---
-    peak_days = (
-        df.groupby('date')['usage_cpu']
-        .sum()
-        .reset_index()
-        .sort_values('usage_cpu', ascending=False)
-    )
     peak_days_list = [
-        {"date": str(d.date()), "total_cpu": u if pd.notna(u) and np.isfinite(u) else None}
-        for d, u in zip(peak_days['date'], peak_days['usage_cpu'])
-    ][:5]
+        {"date": day, "total_cpu": _finite(total)}
+        for day, total in peak_days(rollups)
+    ]
 
     # --- Monthly CPU trend ---
-    monthly = (
-        df.groupby(df['date'].dt.month)['usage_cpu']
-        .mean()
-        .reset_index()
-    )
     monthly_list = [
-        {
-            "month_num": int(row['date']),
-            "cpu_usage": float(row['usage_cpu']) if pd.notna(row['usage_cpu']) and np.isfinite(row['usage_cpu']) else None
-        }
-        for _, row in monthly.iterrows()
+        {"month_num": int(month), "cpu_usage": _finite(avg)}
+        for month, avg in monthly_means(rollups, key="month_of_year")
     ]
 
     # --- External factors impact (real correlations) ---
@@ -53,16 +42,16 @@ def get_insights():
         "cpu_roll_max_7", "cpu_roll_min_7"
     ]
 
+    corr = correlations(rollups)
     external_factors_impact = []
 
-    for feature, corr_dict in correlations.items():
-        if isinstance(corr_dict, dict):
-            score = corr_dict.get("usage_cpu")
-            if pd.notna(score) and np.isfinite(score):
-                external_factors_impact.append({
-                    "factor": feature.replace("_", " ").title(),
-                    "impact_score": round(score, 2)
-                })
+    for feature in external_columns:
+        score = corr.get(feature, {}).get("usage_cpu")
+        if score is not None and pd.notna(score) and np.isfinite(score):
+            external_factors_impact.append({
+                "factor": feature.replace("_", " ").title(),
+                "impact_score": round(float(score), 2)
+            })
 
     print("Top regions:", top_regions_list)
     print("Monthly trend:", monthly_list)
@@ -74,4 +63,4 @@ def get_insights():
         "monthly_cpu_trend": monthly_list,
         "external_factors_impact": external_factors_impact
 
-    }
\ No newline at end of file
+    }
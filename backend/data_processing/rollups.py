@@ -0,0 +1,383 @@
+import json
+import threading
+import numpy as np
+import pandas as pd
+from config import ROLLUP_FILE
+from data_processing.dataset import get_dataset, dataset_version
+
+# Insight aggregates materialised at ingest time.
+# Everything stored here is mergeable (sums, counts, fixed-size value summaries and
+# correlation moment matrices), so appending new days only needs the new rows.
+TARGET = "usage_cpu"
+# Bumped when the stored layout changes; rollups in an older layout are rebuilt
+ROLLUP_FORMAT = 3
+
+# Value summaries keep quantiles in log-spaced bins (DDSketch-style): any quantile is
+# returned within RELATIVE_ACCURACY of a true value, and at most MAX_BINS bins are kept
+# per sign (the lowest ones are collapsed first), so a summary's size is bounded
+# whatever the number of rows.
+RELATIVE_ACCURACY = 0.005
+MAX_BINS = 2048
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = np.log(_GAMMA)
+# Summaries of up to this many values also keep the values themselves, so small groups
+# report exact medians; past it they are dropped and the bins above are used instead
+EXACT_VALUES = 4096
+
+# Derived columns the dashboard correlates alongside the stored ones: (name, source, scale)
+DERIVED_COLUMNS = [
+    ("cpu_before", "usage_cpu", 0.6),
+    ("cpu_after", "usage_cpu", 1.0),
+    ("storage_before", "usage_storage", 0.7),
+    ("storage_after", "usage_storage", 1.0),
+]
+
+_lock = threading.Lock()
+_cache = {"mtime": None, "rollups": None}
+
+
+# ------------------------------
+# Building and merging
+# ------------------------------
+def _numeric_columns(df):
+    return [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+
+
+def _bins(magnitudes: np.ndarray) -> dict:
+    keys, counts = np.unique(np.ceil(np.log(magnitudes) / _LOG_GAMMA).astype("int64"), return_counts=True)
+    return _collapse({str(k): int(n) for k, n in zip(keys, counts)})
+
+
+def _collapse(bins: dict) -> dict:
+    if len(bins) <= MAX_BINS:
+        return bins
+    keys = sorted(bins, key=int)
+    low, kept = keys[:len(keys) - MAX_BINS + 1], keys[len(keys) - MAX_BINS + 1:]
+    out = {k: bins[k] for k in kept}
+    out[low[-1]] = sum(bins[k] for k in low)
+    return out
+
+
+def _summary(values: pd.Series) -> dict:
+    """count, sum, sum of squares, min, max and quantile bins of the non-null values (and the sorted values while few)."""
+    x = values.dropna().to_numpy(dtype="float64")
+    return {
+        "count": int(len(x)),
+        "sum": float(x.sum()),
+        "sumsq": float((x ** 2).sum()),
+        "min": float(x.min()) if len(x) else None,
+        "max": float(x.max()) if len(x) else None,
+        "zero": int((x == 0).sum()),
+        "pos": _bins(x[x > 0]),
+        "neg": _bins(-x[x < 0]),
+        "values": np.sort(x).tolist() if len(x) <= EXACT_VALUES else None,
+    }
+
+
+def _merge_values(a, b):
+    if a["values"] is None or b["values"] is None or a["count"] + b["count"] > EXACT_VALUES:
+        return None
+    return np.sort(np.concatenate([a["values"], b["values"]])).tolist()
+
+
+def _merge_bins(a, b):
+    out = dict(a)
+    for k, n in b.items():
+        out[k] = out.get(k, 0) + n
+    return _collapse(out)
+
+
+def _extreme(pick, a, b):
+    values = [v for v in (a, b) if v is not None]
+    return pick(values) if values else None
+
+
+def _merge_summary(a, b):
+    return {
+        "count": a["count"] + b["count"],
+        "sum": a["sum"] + b["sum"],
+        "sumsq": a["sumsq"] + b["sumsq"],
+        "min": _extreme(min, a["min"], b["min"]),
+        "max": _extreme(max, a["max"], b["max"]),
+        "zero": a["zero"] + b["zero"],
+        "pos": _merge_bins(a["pos"], b["pos"]),
+        "neg": _merge_bins(a["neg"], b["neg"]),
+        "values": _merge_values(a, b),
+    }
+
+
+def _moments(df, columns):
+    """Pairwise-complete moment matrices; enough to rebuild Pearson correlations after merging."""
+    x = df[columns].to_numpy(dtype="float64")
+    present = (~np.isnan(x)).astype("float64")
+    x0 = np.nan_to_num(x)
+    return {
+        "n": (present.T @ present).tolist(),
+        "sx": (x0.T @ present).tolist(),
+        "sxx": ((x0 ** 2).T @ present).tolist(),
+        "sxy": (x0.T @ x0).tolist(),
+    }
+
+
+def _aggregate(df: pd.DataFrame, columns) -> dict:
+    df = df.dropna(subset=["date"])
+    dates = df["date"]
+    cpu = df[TARGET]
+
+    regions = {}
+    for region, group in df.groupby("region", observed=True):
+        util = group["utilization_ratio"] if "utilization_ratio" in group.columns else pd.Series(dtype=float)
+        regions[str(region)] = {
+            "cpu_sum": float(group[TARGET].sum()),
+            "cpu_count": int(group[TARGET].count()),
+            "util_sum": float(util.sum()),
+            "util_count": int(util.count()),
+            "cpu": _summary(group[TARGET]),
+        }
+
+    daily = cpu.groupby(dates.dt.strftime("%Y-%m-%d")).sum()
+    month = cpu.groupby(dates.dt.strftime("%Y-%m")).agg(["sum", "count"])
+    month_of_year = cpu.groupby(dates.dt.month).agg(["sum", "count"])
+    dow_cpu = {
+        str(int(dow)): _summary(values)
+        for dow, values in cpu.groupby(dates.dt.dayofweek + 1)
+    }
+    last_dates = df.groupby(["region", "resource_type"], observed=True)["date"].max()
+
+    return {
+        "format": ROLLUP_FORMAT,
+        "columns": columns,
+        # Judged on values: metrics are held as floats in memory even when they are whole numbers
+        "target_is_integer": bool((cpu.dropna() % 1 == 0).all()),
+        "series_last_date": {f"{r}|{t}": d.strftime("%Y-%m-%d") for (r, t), d in last_dates.items()},
+        "regions": regions,
+        "daily_cpu": {d: float(v) for d, v in daily.items()},
+        "month": {m: [float(r["sum"]), int(r["count"])] for m, r in month.iterrows()},
+        "month_of_year": {str(int(m)): [float(r["sum"]), int(r["count"])] for m, r in month_of_year.iterrows()},
+        "dow_cpu": dow_cpu,
+        "moments": _moments(df, columns),
+    }
+
+
+def _merge(a: dict, b: dict) -> dict:
+    out = dict(a)
+    out["series_last_date"] = {**a["series_last_date"], **b["series_last_date"]}
+
+    regions = dict(a["regions"])
+    for region, stats in b["regions"].items():
+        if region not in regions:
+            regions[region] = stats
+            continue
+        old = regions[region]
+        regions[region] = {
+            "cpu_sum": old["cpu_sum"] + stats["cpu_sum"],
+            "cpu_count": old["cpu_count"] + stats["cpu_count"],
+            "util_sum": old["util_sum"] + stats["util_sum"],
+            "util_count": old["util_count"] + stats["util_count"],
+            "cpu": _merge_summary(old["cpu"], stats["cpu"]),
+        }
+    out["regions"] = regions
+
+    out["daily_cpu"] = dict(a["daily_cpu"])
+    for d, v in b["daily_cpu"].items():
+        out["daily_cpu"][d] = out["daily_cpu"].get(d, 0.0) + v
+
+    for key in ["month", "month_of_year"]:
+        merged = dict(a[key])
+        for k, (s, n) in b[key].items():
+            prev = merged.get(k, [0.0, 0])
+            merged[k] = [prev[0] + s, prev[1] + n]
+        out[key] = merged
+
+    out["dow_cpu"] = dict(a["dow_cpu"])
+    for dow, summary in b["dow_cpu"].items():
+        out["dow_cpu"][dow] = _merge_summary(out["dow_cpu"][dow], summary) if dow in out["dow_cpu"] else summary
+
+    out["moments"] = {
+        k: (np.array(a["moments"][k]) + np.array(b["moments"][k])).tolist() for k in a["moments"]
+    }
+    return out
+
+
+def _save(rollups):
+    ROLLUP_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ROLLUP_FILE.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(rollups, f)
+    tmp.replace(ROLLUP_FILE)
+    with _lock:
+        _cache.update(mtime=ROLLUP_FILE.stat().st_mtime_ns, rollups=rollups)
+
+
+def build_rollups(df: pd.DataFrame = None) -> dict:
+    """Full rebuild from the processed feature set (called after a full feature build)."""
+    if df is None:
+        df = get_dataset()
+    return save_rollups(add_rollups(None, df))
+
+
+def add_rollups(rollups, df: pd.DataFrame) -> dict:
+    """rollups (None to start) with df's rows merged in, for building over a dataset part by part."""
+    if rollups is None:
+        return _aggregate(df, _numeric_columns(df))
+    return _merge(rollups, _aggregate(df, rollups["columns"]))
+
+
+def save_rollups(rollups: dict) -> dict:
+    """Store rollups built with add_rollups as those of the current dataset."""
+    rollups["dataset_version"] = dataset_version()
+    _save(rollups)
+    return rollups
+
+
+def update_rollups(new_rows: pd.DataFrame) -> dict:
+    """
+    Merge newly ingested rows into the stored rollups.
+    Rows at or before a series' last rolled-up date are skipped, so re-sent days are not double counted.
+    """
+    current = load_rollups()
+    if current is None or current.get("format") != ROLLUP_FORMAT or current["columns"] != _numeric_columns(new_rows):
+        return build_rollups()
+
+    last = pd.Series(current["series_last_date"])
+    keys = new_rows["region"].astype(str) + "|" + new_rows["resource_type"].astype(str)
+    cutoff = pd.to_datetime(keys.map(last))
+    fresh = new_rows[cutoff.isna().to_numpy() | (new_rows["date"] > cutoff).to_numpy()]
+
+    if not fresh.empty:
+        current = _merge(current, _aggregate(fresh, current["columns"]))
+    current["dataset_version"] = dataset_version()
+    _save(current)
+    return current
+
+
+def load_rollups():
+    if not ROLLUP_FILE.exists():
+        return None
+    mtime = ROLLUP_FILE.stat().st_mtime_ns
+    with _lock:
+        if _cache["mtime"] == mtime:
+            return _cache["rollups"]
+    with open(ROLLUP_FILE) as f:
+        rollups = json.load(f)
+    with _lock:
+        _cache.update(mtime=mtime, rollups=rollups)
+    return rollups
+
+
+def get_rollups() -> dict:
+    """Stored rollups, rebuilt first if missing or built from a different dataset version."""
+    rollups = load_rollups()
+    if rollups is None or rollups.get("format") != ROLLUP_FORMAT or rollups.get("dataset_version") != dataset_version():
+        rollups = build_rollups()
+    return rollups
+
+
+# ------------------------------
+# Reading aggregates
+# ------------------------------
+def _mean(total, count):
+    return total / count if count else None
+
+
+def _value_at_rank(summary, rank, as_int):
+    """Estimate of the rank-th smallest value (0-based), clamped to the exact min/max."""
+    # Ascending: negative bins by decreasing magnitude, zeros, positive bins by increasing magnitude.
+    # A bin k holds magnitudes in (gamma^(k-1), gamma^k]; 2 gamma^k / (gamma + 1) is within the accuracy of all of them
+    neg = sorted(((int(k), n) for k, n in summary["neg"].items()), reverse=True)
+    pos = sorted((int(k), n) for k, n in summary["pos"].items())
+    estimates = [-2 * _GAMMA ** k / (_GAMMA + 1) for k, _ in neg] + [0.0] + [2 * _GAMMA ** k / (_GAMMA + 1) for k, _ in pos]
+    counts = [n for _, n in neg] + [summary["zero"]] + [n for _, n in pos]
+    value = estimates[int(np.searchsorted(np.cumsum(counts), rank + 1))]
+    value = min(max(value, summary["min"]), summary["max"])
+    return float(round(value)) if as_int else value
+
+
+def _median_min_max(summary, as_int):
+    """Median (exact while the summary still holds its values, else within RELATIVE_ACCURACY), min and max."""
+    total = summary["count"]
+    if not total:
+        return None, None, None
+    if summary["values"] is not None:
+        median = float(np.median(summary["values"]))
+    else:
+        lo = _value_at_rank(summary, (total - 1) // 2, as_int)
+        hi = _value_at_rank(summary, total // 2, as_int)
+        median = (lo + hi) / 2
+    cast = int if as_int else float
+    return median, cast(summary["min"]), cast(summary["max"])
+
+
+def _std(summary):
+    n = summary["count"]
+    if n < 2:
+        return None
+    variance = (summary["sumsq"] - summary["sum"] ** 2 / n) / (n - 1)
+    return float(np.sqrt(max(variance, 0.0)))
+
+
+def region_stats(rollups):
+    """
+    {region: {"avg_cpu", "avg_utilization", "std_cpu", "min", "median", "median_exact", "max"}} sorted by region.
+    median_exact is False once a region has more than EXACT_VALUES rows and its median comes from the bins.
+    """
+    as_int = rollups["target_is_integer"]
+    out = {}
+    for region in sorted(rollups["regions"]):
+        stats = rollups["regions"][region]
+        median, lo, hi = _median_min_max(stats["cpu"], as_int)
+        out[region] = {
+            "avg_cpu": _mean(stats["cpu_sum"], stats["cpu_count"]),
+            "avg_utilization": _mean(stats["util_sum"], stats["util_count"]),
+            "std_cpu": _std(stats["cpu"]),
+            "min": lo,
+            "median": median,
+            "median_exact": stats["cpu"]["values"] is not None,
+            "max": hi,
+        }
+    return out
+
+
+def day_of_week_stats(rollups):
+    as_int = rollups["target_is_integer"]
+    rows = []
+    for dow in sorted(rollups["dow_cpu"], key=int):
+        median, lo, hi = _median_min_max(rollups["dow_cpu"][dow], as_int)
+        exact = rollups["dow_cpu"][dow]["values"] is not None
+        rows.append({"day_of_week": int(dow), "min": lo, "median": median, "median_exact": exact, "max": hi})
+    return rows
+
+
+def peak_days(rollups, n=5):
+    daily = sorted(rollups["daily_cpu"].items(), key=lambda kv: kv[1], reverse=True)
+    return daily[:n]
+
+
+def monthly_means(rollups, key="month"):
+    return [(k, _mean(s, c)) for k, (s, c) in sorted(rollups[key].items(), key=lambda kv: kv[0] if key == "month" else int(kv[0]))]
+
+
+def correlations(rollups, with_derived=False):
+    """Pairwise-complete Pearson correlation matrix as {col: {col: r}}, like DataFrame.corr()."""
+    m = {k: np.array(v) for k, v in rollups["moments"].items()}
+    n, sx, sxx, sxy = m["n"], m["sx"], m["sxx"], m["sxy"]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sxy - sx * sx.T
+        var = n * sxx - sx ** 2
+        # Treat variance lost to rounding as zero, like a constant column in DataFrame.corr()
+        var[var <= 1e-12 * n * sxx] = 0.0
+        corr = cov / np.sqrt(var * var.T)
+    corr[(n < 2) | ~np.isfinite(corr)] = np.nan
+    corr = np.clip(corr, -1.0, 1.0)
+
+    columns = list(rollups["columns"])
+    aliases = {c: c for c in columns}
+    if with_derived:
+        for name, source, _ in DERIVED_COLUMNS:
+            if source in aliases:
+                aliases[name] = source
+    position = {c: i for i, c in enumerate(columns)}
+    return {
+        a: {b: corr[position[aliases[a]], position[aliases[b]]] for b in aliases}
+        for a in aliases
+    }
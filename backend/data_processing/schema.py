@@ -0,0 +1,43 @@
+import pandas as pd
+
+# In-memory dtypes for feature frames, applied wherever a frame is loaded.
+# Every uvicorn worker holds its own copy of the dataset, so labels, calendar
+# fields and flags are kept as narrow as their values allow. Other columns keep
+# their stored values: float metrics are float64 and integer metrics stay integers.
+# Metrics are not narrowed to float32 because every one of them is a model input,
+# and the models must see the values they were trained on; float32 rounding moved
+# XGBoost predictions.
+CATEGORY_COLUMNS = ["region", "resource_type"]
+CALENDAR_DTYPES = {
+    "day_of_week": "int8",
+    "month": "int8",
+    "quarter": "int8",
+    "year": "int16",
+}
+BOOL_COLUMNS = ["is_weekend"]
+METRIC_DTYPE = "float64"
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Return df with registry dtypes; columns that are not in the registry are left alone."""
+    dtypes = {}
+    for col in df.columns:
+        series = df[col]
+        if col in CATEGORY_COLUMNS:
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                dtypes[col] = "category"
+        elif col in CALENDAR_DTYPES:
+            # Calendar fields with gaps stay as metrics rather than failing the integer cast
+            dtypes[col] = CALENDAR_DTYPES[col] if series.notna().all() else METRIC_DTYPE
+        elif col in BOOL_COLUMNS:
+            if series.notna().all():
+                dtypes[col] = "bool"
+        elif pd.api.types.is_float_dtype(series):
+            dtypes[col] = METRIC_DTYPE
+    dtypes = {col: dtype for col, dtype in dtypes.items() if df[col].dtype != dtype}
+    return df.astype(dtypes) if dtypes else df
+
+
+def model_columns(df: pd.DataFrame):
+    """Columns a model has to label-encode before scaling (strings and categoricals)."""
+    return list(df.select_dtypes(include=["object", "category"]).columns)
@@ -1,8 +1,8 @@
 from fastapi import FastAPI, Query
 import pandas as pd
 import numpy as np
-from pathlib import Path
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from fastapi import FastAPI
@@ -12,6 +12,11 @@ import sys
 import os
 from scheduler import start_scheduler
 start_scheduler()
+import threading
+from models.registry import load_models
+# Warm the model registry in the background; /api/ready reports when it is done.
+# Not a daemon: exiting while TensorFlow is mid-import aborts the interpreter.
+threading.Thread(target=load_models, name="model-warmup").start()
 
 
 # Add backend root to sys.path
@@ -19,6 +24,14 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.evaluate import evaluate 
 from routes.insights import summarize_backtest
 from utils.file_utils import load_dataframe  # or wherever load_data is defined
+from data_processing.dataset import get_dataset, get_index
+from data_processing.feature_index import cursor_page
+from utils.json_utils import FastJSONResponse, frame_records, frame_columns
+from utils.arrow_utils import arrow_response
+from utils.http_cache import conditional_get
+from data_processing.rollups import (
+    get_rollups, region_stats, peak_days, monthly_means, correlations, day_of_week_stats
+)
 from routes.model_comparison import router as comparison_router
 from routes.insights import router as insights_router
 from routes import monitoring
@@ -29,7 +42,7 @@ import logging
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 
 # --- CORS ---
 app.add_middleware(
@@ -40,6 +53,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# --- Compression of large bodies, and conditional GET (ETag from dataset/model versions) ---
+# GZip is registered first so it sits inside the ETag middleware and sees complete bodies
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+app.middleware("http")(conditional_get)
+
 app.include_router(forecast_router)
 app.include_router(metrics_router)
 app.include_router(comparison_router, prefix='/api')
@@ -47,9 +65,6 @@ app.include_router(insights_router, prefix="/api")
 app.include_router(monitoring.router)
 
 
-# --- CSV Path ---
-CSV_PATH = Path(__file__).parent / "data" / "processed" / "feature_engineered.csv"
-
 # --- Resource Type Mapping ---
 RESOURCE_TYPE_TO_METRIC = {
     "VM": "usage_cpu",
@@ -60,7 +75,7 @@ RESOURCE_TYPE_TO_METRIC = {
 # --- Helper ---
 def load_data():
     try:
-        df = pd.read_csv(CSV_PATH, parse_dates=["date"])
+        df = get_dataset()
         df = df[[col for col in df.columns if "_daily" not in col]]
         return df
     except FileNotFoundError:
@@ -77,34 +92,64 @@ def get_features(
     resource_type: str = Query(None),
     start_date: str = Query(None),
     end_date: str = Query(None),
+    cursor: str = Query(None),
+    include_total: bool = Query(False),
+    format: str = Query("records", pattern="^(records|columnar|arrow)$"),
 ):
-    df = load_data()
-    if df.empty:
-        return JSONResponse(content={"data": [], "total": 0})
-
-    clean_df = df.replace([np.nan, np.inf, -np.inf], None).copy()
-    clean_df["date"] = pd.to_datetime(clean_df["date"], errors="coerce")
+    metric_col = RESOURCE_TYPE_TO_METRIC.get(resource_type)
+    columns = ["date", "region", "resource_type", metric_col] if metric_col else None
 
-    if region:
-        clean_df = clean_df[clean_df["region"].str.lower() == region.lower()]
-    if resource_type:
-        clean_df = clean_df[clean_df["resource_type"] == resource_type]
+    # Keyset mode: pass cursor= (empty) for the first page, then the returned next_cursor
+    if cursor is not None:
+        filters = dict(region=region, resource_type=resource_type, start_date=start_date, end_date=end_date, ignore_case=True)
+        return features_cursor_page(cursor, page_size, columns, include_total, filters, format)
 
-    metric_col = RESOURCE_TYPE_TO_METRIC.get(resource_type)
-    if metric_col and metric_col in clean_df.columns:
-        clean_df = clean_df[["date", "region", "resource_type", metric_col]]
+    try:
+        df = get_index().query(
+            region=region,
+            resource_type=resource_type,
+            start_date=start_date,
+            end_date=end_date,
+            columns=columns,
+            ignore_case=True,
+        )
+    except FileNotFoundError:
+        return FastJSONResponse(content={"data": [], "total": 0})
 
-    if start_date:
-        clean_df = clean_df[clean_df["date"] >= pd.to_datetime(start_date)]
-    if end_date:
-        clean_df = clean_df[clean_df["date"] <= pd.to_datetime(end_date)]
+    clean_df = df[[col for col in df.columns if "_daily" not in col]]
 
     start = (page - 1) * page_size
     end = start + page_size
-    page_data = clean_df.iloc[start:end].copy()
-    page_data["date"] = page_data["date"].astype(str)
+    return features_response(clean_df.iloc[start:end], format, total=len(clean_df))
+
+def features_response(page_data, format, **extra):
+    """
+    records: [{column: value}], columnar: {column: [values]}, arrow: Arrow IPC stream with
+    `extra` (total, next_cursor) in the schema metadata instead of the JSON body.
+    """
+    if format == "arrow":
+        return arrow_response(page_data, extra)
+    data = frame_columns(page_data) if format == "columnar" else frame_records(page_data)
+    return FastJSONResponse(content={"data": data, **extra})
+
+def features_cursor_page(cursor, page_size, columns, include_total, filters, format="records"):
+    try:
+        index = get_index()
+    except FileNotFoundError:
+        return FastJSONResponse(content={"data": [], "next_cursor": None, "total": 0})
 
-    return JSONResponse(content={"data": page_data.to_dict(orient="records"), "total": len(clean_df)})
+    try:
+        page_data, next_cursor = cursor_page(index, cursor, page_size, columns=columns, **filters)
+    except ValueError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=400)
+    page_data = page_data[[col for col in page_data.columns if "_daily" not in col]]
+
+    return features_response(
+        page_data,
+        format,
+        next_cursor=next_cursor,
+        total=index.count_cached(**filters) if include_total else None,
+    )
 
 # -------------------------------
 # Regions Endpoint
@@ -148,7 +193,6 @@ def get_date_range():
     if df.empty or "date" not in df.columns:
         return {"min_date": None, "max_date": None}
 
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
     min_date = df["date"].min().date() if not df["date"].isna().all() else None
     max_date = df["date"].max().date() if not df["date"].isna().all() else None
     return {"min_date": str(min_date), "max_date": str(max_date)}
@@ -163,8 +207,8 @@ def get_insights():
         df = load_data()
         if df.empty:
             return JSONResponse(content={"message": "No data available"}, status_code=404)
+        df = df[["date", "region", "usage_cpu", "usage_storage"]].copy()
 
-        df["date"] = pd.to_datetime(df["date"])
         df["cpu_before"] = df["usage_cpu"] * 0.6
         df["cpu_after"] = df["usage_cpu"]
         df["storage_before"] = df["usage_storage"] * 0.7
@@ -172,60 +216,48 @@ def get_insights():
 
         insights = {}
 
-        insights["comparison"] = df[["region", "cpu_before", "cpu_after", "storage_before", "storage_after"]].copy().to_dict(orient="records")
-
-        if "usage_cpu" in df.columns:
-            top_regions = (
-                df.groupby("region")["usage_cpu"]
-                .mean()
-                .sort_values(ascending=False)
-                .head(5)
-                .reset_index()
-            )
-            insights["top_regions_by_utilization"] = [
-                {"region": row["region"], "avg_utilization": float(row["usage_cpu"]) if not np.isnan(row["usage_cpu"]) else None}
-                for _, row in top_regions.iterrows()
-            ]
-
-            daily_cpu = df.groupby("date")["usage_cpu"].sum().reset_index()
-            peak_days = daily_cpu.sort_values("usage_cpu", ascending=False).head(5)
-            insights["peak_usage_days"] = [
-                {"date": str(row["date"]), "total_cpu": float(row["usage_cpu"]) if not np.isnan(row["usage_cpu"]) else None}
-                for _, row in peak_days.iterrows()
-            ]
-
-            df["month_num"] = df["date"].dt.to_period("M").astype(str)
-            monthly = df.groupby("month_num")["usage_cpu"].mean().reset_index()
-            insights["monthly_cpu_trend"] = [
-                {"month_num": row["month_num"], "avg_cpu": float(row["usage_cpu"]) if not np.isnan(row["usage_cpu"]) else None}
-                for _, row in monthly.iterrows()
-            ]
-
-        numeric_cols = df.select_dtypes(include=["float64", "int64"]).columns
-        if not numeric_cols.empty:
-            corr = df[numeric_cols].corr().round(3)
-            insights["correlations"] = {
-                col: {k: (None if np.isnan(v) else float(v)) for k, v in corr[col].items()}
-                for col in corr.columns
-            }
-
-        seasonality = (
-            df.groupby(df["date"].dt.to_period("M"))["usage_cpu"]
-            .mean()
-            .reset_index()
-        )
-        seasonality["month"] = seasonality["date"].astype(str) + "-01"
-        seasonality = seasonality.rename(columns={"usage_cpu": "cpu_usage"}).drop(columns=["date"])
+        insights["comparison"] = frame_records(df[["region", "cpu_before", "cpu_after", "storage_before", "storage_after"]])
+
+        # Aggregates are materialised at ingest (data_processing.rollups); nothing is grouped per request
+        rollups = get_rollups()
+        regions = region_stats(rollups)
+
+        top_regions = sorted(
+            ((r, stats["avg_cpu"]) for r, stats in regions.items()),
+            key=lambda kv: float("-inf") if kv[1] is None else kv[1],
+            reverse=True,
+        )[:5]
+        insights["top_regions_by_utilization"] = [
+            {"region": region, "avg_utilization": avg} for region, avg in top_regions
+        ]
 
-        df["day_of_week"] = df["date"].dt.dayofweek + 1
-        day_stats = df.groupby("day_of_week")["usage_cpu"].agg(["min", "median", "max"]).reset_index()
+        insights["peak_usage_days"] = [
+            {"date": str(pd.Timestamp(day)), "total_cpu": total}
+            for day, total in peak_days(rollups)
+        ]
+
+        monthly = monthly_means(rollups)
+        insights["monthly_cpu_trend"] = [
+            {"month_num": month, "avg_cpu": avg} for month, avg in monthly
+        ]
+
+        corr = correlations(rollups, with_derived=True)
+        corr_cols = sorted(col for col in corr if "_daily" not in col)
+        insights["correlations"] = {
+            col: {k: (None if np.isnan(corr[col][k]) else round(float(corr[col][k]), 3)) for k in corr_cols}
+            for col in corr_cols
+        }
 
         insights["chart_data"] = {
-            "day_of_week_stats": day_stats.to_dict(orient="records"),
-            "regional_stats": df.groupby("region")["usage_cpu"].agg(["min", "median", "max"]).reset_index().to_dict(orient="records"),
-            "peak_usage": df.groupby("region")["usage_cpu"].max().reset_index().rename(columns={"usage_cpu": "cpu_peak"}).to_dict(orient="records"),
-            "seasonality": seasonality.to_dict(orient="records"),
-            "time_series": df[["date", "region", "usage_cpu"]].copy().to_dict(orient="records")
+            "day_of_week_stats": day_of_week_stats(rollups),
+            "regional_stats": [
+                {"region": r, "min": stats["min"], "median": stats["median"],
+                 "median_exact": stats["median_exact"], "max": stats["max"]}
+                for r, stats in regions.items()
+            ],
+            "peak_usage": [{"region": r, "cpu_peak": stats["max"]} for r, stats in regions.items()],
+            "seasonality": [{"cpu_usage": avg, "month": f"{month}-01"} for month, avg in monthly],
+            "time_series": frame_records(df[["date", "region", "usage_cpu"]].assign(date=df["date"].dt.strftime("%Y-%m-%dT%H:%M:%S")))
         }
 
         # ✅ Backtest summary integration
@@ -236,7 +268,7 @@ def get_insights():
         ]
 
         logger.info("✅ /api/insights route executed successfully")
-        return JSONResponse(content=jsonable_encoder(insights))
+        return FastJSONResponse(content=insights)
 
     except Exception as e:
         logger.error(f"❌ Error in /api/insights: {str(e)}")
@@ -247,7 +279,7 @@ def get_insights():
 @app.get("/api/debug-features")
 def debug_features():
     df = load_data()
-    return JSONResponse(content=df.head(10).to_dict(orient="records"))
+    return FastJSONResponse(content=df.head(10).to_dict(orient="records"))
 
 @app.get("/api/debug-insights")
 def debug_insights():
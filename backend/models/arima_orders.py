@@ -0,0 +1,121 @@
+# models/arima_orders.py
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from statsmodels.tsa.arima.model import ARIMA
+from statsmodels.tsa.stattools import adfuller
+from config import ARIMA_ORDER, ARIMA_STATE_DIR, ARIMA_MAX_P, ARIMA_MAX_D, ARIMA_MAX_Q
+from models.forecast_jobs import pool_size, init_worker
+
+logger = logging.getLogger(__name__)
+
+# Automatic ARIMA order per (region, resource_type). The differencing order d is the
+# smallest that makes the series stationary (ADF test) — AIC is not comparable across
+# d — and (p, q) is the lowest-AIC candidate in the bounded grid. Candidates are fitted
+# in parallel on a process pool; the previous winner is refitted from its stored
+# parameters. Winners are persisted and used by every later ARIMA fit.
+
+ORDERS_PATH = ARIMA_STATE_DIR / "arima_orders.json"
+ADF_PVALUE = 0.05
+
+_lock = threading.Lock()
+_orders = {"version": None, "entries": {}}
+
+
+def series_name(region: str, resource_type: str) -> str:
+    return f"{region}__{resource_type}"
+
+
+def _version():
+    try:
+        stat = ORDERS_PATH.stat()
+    except FileNotFoundError:
+        return None
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def selected_orders() -> dict:
+    """{series name: {"order", "aic", "params", "selected_at"}}, re-read when the file changes."""
+    version = _version()
+    with _lock:
+        if version != _orders["version"]:
+            entries = json.loads(ORDERS_PATH.read_text()) if version else {}
+            _orders.update(version=version, entries=entries)
+        return _orders["entries"]
+
+
+def order_for(region: str, resource_type: str):
+    """(order, start params or None) to fit this series with."""
+    entry = selected_orders().get(series_name(region, resource_type))
+    if entry is None:
+        return tuple(ARIMA_ORDER), None
+    return tuple(entry["order"]), entry.get("params")
+
+
+def differencing_order(series) -> int:
+    values = series.to_numpy()
+    for d in range(ARIMA_MAX_D):
+        try:
+            if adfuller(values, autolag="AIC")[1] < ADF_PVALUE:
+                return d
+        except Exception:
+            break
+        values = np.diff(values)
+    return ARIMA_MAX_D
+
+
+def candidate_orders(d: int) -> list:
+    return [(p, d, q) for p in range(ARIMA_MAX_P + 1) for q in range(ARIMA_MAX_Q + 1)]
+
+
+def _score(task):
+    """Worker: AIC of one candidate order -> (name, order, aic, params); aic is inf if the fit fails."""
+    name, series, order, start_params = task
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            results = ARIMA(series, order=order).fit(start_params=start_params)
+        aic = float(results.aic)
+        return name, order, aic if np.isfinite(aic) else float("inf"), results.params.tolist()
+    except Exception:
+        return name, order, float("inf"), None
+
+
+def search_orders(series: dict) -> dict:
+    """
+    series: {(region, resource_type): daily series}. Scores every candidate order in
+    parallel, persists the winners and returns {series name: winning entry}.
+    """
+    previous = selected_orders()
+    tasks = []
+    for (region, resource_type), values in series.items():
+        name = series_name(region, resource_type)
+        prior = previous.get(name, {})
+        for order in candidate_orders(differencing_order(values)):
+            warm = prior.get("params") if tuple(prior.get("order", ())) == order else None
+            tasks.append((name, values, order, warm))
+
+    best = {}
+    start = time.perf_counter()
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=pool_size(), mp_context=context, initializer=init_worker) as pool:
+        chunk = max(1, len(tasks) // (pool_size() * 4))
+        for name, order, aic, params in pool.map(_score, tasks, chunksize=chunk):
+            if params is not None and aic < best.get(name, {}).get("aic", float("inf")):
+                best[name] = {"order": list(order), "aic": round(aic, 4), "params": params, "selected_at": time.time()}
+    logger.info(f"ARIMA order search: {len(tasks)} candidates for {len(series)} series in {time.perf_counter() - start:.1f}s")
+
+    # Series whose every candidate failed keep their previous order
+    winners = {**previous, **best}
+    ORDERS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = ORDERS_PATH.with_name(f"{ORDERS_PATH.stem}.tmp-{uuid.uuid4().hex}{ORDERS_PATH.suffix}")
+    tmp.write_text(json.dumps(winners, indent=2))
+    os.replace(tmp, ORDERS_PATH)
+    return best
@@ -0,0 +1,167 @@
+# models/arima_state.py
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+import warnings
+import joblib
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+from config import TARGET, ARIMA_REFIT_AFTER, ARIMA_STATE_DIR
+from data_processing.dataset import dataset_version
+from models.arima_orders import order_for, search_orders, ORDERS_PATH
+
+logger = logging.getLogger(__name__)
+
+# Fitted ARIMA results per (region, resource_type), kept in memory and on disk together
+# with the dataset version and the observations they were fitted on. When a series only
+# gained new days, the results are extended with append(refit=False) — a filter pass
+# over the new points with the fitted parameters — instead of a new maximum-likelihood
+# fit. A series is fully refitted when its history changed, after ARIMA_REFIT_AFTER
+# appended days, or by refit_all() (scheduled retraining / drift). The order is the one
+# selected for the series by models/arima_orders.py.
+
+REFIT_MARKER = ARIMA_STATE_DIR / "refit.json"
+
+_lock = threading.Lock()
+_states = {}        # (region, resource_type) -> state dict
+_series_locks = {}  # one fitter at a time per series
+
+
+def daily_series(df: pd.DataFrame) -> pd.Series:
+    """The target as a gap-free daily series (missing days interpolated)."""
+    series = df[["date", TARGET]].dropna().drop_duplicates("date", keep="last")
+    series = series.set_index(pd.DatetimeIndex(series["date"]))[TARGET].astype("float64").sort_index()
+    return series.asfreq("D").interpolate(method="linear")
+
+
+def _fingerprint(values) -> str:
+    return hashlib.sha1(np.ascontiguousarray(values, dtype="float64").tobytes()).hexdigest()
+
+
+def _path(key):
+    name = re.sub(r"[^A-Za-z0-9_.-]+", "_", "__".join(key))
+    return ARIMA_STATE_DIR / f"{name}.pkl"
+
+
+def _series_lock(key):
+    with _lock:
+        return _series_locks.setdefault(key, threading.Lock())
+
+
+def _fit(series, order, version, start_params=None):
+    with warnings.catch_warnings():
+        # Convergence/frequency chatter from statsmodels on short series
+        warnings.simplefilter("ignore")
+        results = ARIMA(series, order=order).fit(start_params=start_params)
+    return {
+        "results": results,
+        "order": order,
+        "n_obs": len(series),
+        "last_date": series.index[-1],
+        "fingerprint": _fingerprint(series.values),
+        "dataset_version": version,
+        "fitted_at": time.time(),
+        "appended": 0,
+    }
+
+
+def _extend(state, series, version, order, start_params):
+    """state brought up to `series`: appended when the history is unchanged, else refitted."""
+    if state is None or state["order"] != order:
+        return _fit(series, order, version, start_params)
+    n = state["n_obs"]
+    grown_only = (
+        len(series) >= n
+        and series.index[n - 1] == state["last_date"]
+        and _fingerprint(series.values[:n]) == state["fingerprint"]
+    )
+    new = series.iloc[n:]
+    if not grown_only or state["appended"] + len(new) > ARIMA_REFIT_AFTER:
+        return _fit(series, order, version, start_params)
+    state = dict(state, dataset_version=version)
+    if len(new):
+        state.update(
+            results=state["results"].append(new, refit=False),
+            n_obs=len(series),
+            last_date=series.index[-1],
+            fingerprint=_fingerprint(series.values),
+            appended=state["appended"] + len(new),
+        )
+    return state
+
+
+def _load(key):
+    state = _states.get(key)
+    if state is None and _path(key).exists():
+        try:
+            state = joblib.load(_path(key))
+        except Exception as e:
+            logger.warning(f"ARIMA state for {key} unreadable, refitting: {e}")
+    return state
+
+
+def _save(key, state):
+    path = _path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Written next to the target and renamed over it, so readers never load a partial file
+    tmp = path.with_name(f"{path.stem}.tmp-{uuid.uuid4().hex}{path.suffix}")
+    joblib.dump(state, tmp)
+    os.replace(tmp, path)
+    _states[key] = state
+
+
+def arima_results(region: str, resource_type: str, df: pd.DataFrame):
+    """Fitted results for this series' rows, up to date with df (appended or refitted as needed)."""
+    key = (region, resource_type)
+    version = dataset_version()
+    order, start_params = order_for(region, resource_type)
+    with _series_lock(key):
+        state = _load(key)
+        if state is not None and state["dataset_version"] == version and state["order"] == order:
+            _states[key] = state
+            return state["results"]
+        state = _extend(state, daily_series(df), version, order, start_params)
+        _save(key, state)
+    return state["results"]
+
+
+def refit_all(df: pd.DataFrame, search: bool = True) -> int:
+    """
+    Fully refit every series in df — after re-selecting each one's order when search is
+    set — and record the refit; returns the number of series fitted.
+    """
+    version = dataset_version()
+    series = {
+        (str(region), str(resource_type)): daily_series(rows)
+        for (region, resource_type), rows in df.groupby(["region", "resource_type"], observed=True)
+    }
+    if search:
+        search_orders(series)
+    fitted = 0
+    for key, values in series.items():
+        order, start_params = order_for(*key)
+        try:
+            with _series_lock(key):
+                _save(key, _fit(values, order, version, start_params))
+            fitted += 1
+        except Exception as e:
+            logger.error(f"ARIMA refit failed for {key}: {e}")
+    REFIT_MARKER.parent.mkdir(parents=True, exist_ok=True)
+    REFIT_MARKER.write_text(json.dumps({"refitted_at": time.time(), "series": fitted}))
+    return fitted
+
+
+def state_version():
+    """Changes whenever refit_all() runs or orders are re-selected, so forecasts cached from the old fits go stale."""
+    signatures = []
+    for path in (REFIT_MARKER, ORDERS_PATH):
+        if path.exists():
+            stat = path.stat()
+            signatures.append(f"{path.stem}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "|".join(signatures) or None
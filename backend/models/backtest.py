@@ -2,7 +2,7 @@ import pandas as pd
 import numpy as np
 from xgboost import XGBRegressor
 from statsmodels.tsa.arima.model import ARIMA
-from tensorflow.keras.models import load_model
+from tensorflow.keras.models import clone_model
 from sklearn.preprocessing import MinMaxScaler, LabelEncoder
 
 import sys
@@ -12,13 +12,16 @@ import os
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
-from config import LSTM_FEATURES
+from config import LSTM_FEATURES, BATCH_AR_ORDER
 from models.evaluate import evaluate
+from data_processing.feature_store import read_features
+from data_processing.schema import model_columns
+from models.registry import get_model
+from models.batch_ar import fit_ar, forecast_ar
 import warnings
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
-DATA_PATH = "data/processed/feature_engineered.csv"
 TARGET = "usage_cpu"
 
 def summarize_metrics(df):
@@ -60,6 +63,30 @@ def backtest_arima(df, window_size=30):
     df_metrics = pd.DataFrame(results)
     return summarize_metrics(df_metrics)
 
+def backtest_ar(df, window_size=30):
+    # Same windows as backtest_arima, but every window is fitted and forecast in one batch
+    df = df.sort_values("date")
+    starts = list(range(0, len(df) - window_size * 2, window_size))
+    if not starts:
+        return summarize_metrics(pd.DataFrame())
+
+    values = df[TARGET].to_numpy(dtype="float64")
+    train = np.stack([values[start:start + window_size] for start in starts])
+    test = np.stack([values[start + window_size:start + window_size * 2] for start in starts])
+    p, d = BATCH_AR_ORDER
+    coef = fit_ar(train, p, d)
+    y_pred = forecast_ar(train, coef, p, d, window_size)
+
+    results = []
+    for row, start in enumerate(starts):
+        if np.isnan(coef[row]).any():
+            print(f"AR failed at window starting {df['date'].iloc[start]}: not enough observations")
+            continue
+        results.append(evaluate(test[row], y_pred[row]))
+
+    df_metrics = pd.DataFrame(results)
+    return summarize_metrics(df_metrics)
+
 def backtest_xgboost(df, window_size=30):
     df = df.sort_values("date")
     results = []
@@ -73,7 +100,7 @@ def backtest_xgboost(df, window_size=30):
         X_test = test.drop(columns=["date", TARGET])
         y_test = test[TARGET]
 
-        for col in X_train.select_dtypes(include="object").columns:
+        for col in model_columns(X_train):
             le = LabelEncoder()
             X_train[col] = le.fit_transform(X_train[col].astype(str))
             X_test[col] = le.transform(X_test[col].astype(str))
@@ -96,7 +123,10 @@ def backtest_xgboost(df, window_size=30):
 
 def backtest_lstm(df, window_size=30):
     df = df.sort_values("date")
-    model = load_model("models/lstm_model.h5", compile=False)
+    # The windows below fine-tune the model, so work on a copy of the served one
+    served = get_model("lstm")
+    model = clone_model(served)
+    model.set_weights(served.get_weights())
     model.compile(optimizer="adam", loss="mse")
 
     results = []
@@ -144,12 +174,16 @@ def backtest_lstm(df, window_size=30):
     return summarize_metrics(df_metrics)
 
 if __name__ == "__main__":
-    df = pd.read_csv(DATA_PATH, parse_dates=["date"])
+    df = read_features()
 
     print("🔁 Running ARIMA backtest...")
     arima_summary = backtest_arima(df)
     arima_summary.to_csv("data/outputs/backtest_arima.csv", index=False)
 
+    print("🔁 Running AR backtest...")
+    ar_summary = backtest_ar(df)
+    ar_summary.to_csv("data/outputs/backtest_ar.csv", index=False)
+
     print("🔁 Running XGBoost backtest...")
     xgb_summary = backtest_xgboost(df)
     xgb_summary.to_csv("data/outputs/backtest_xgboost.csv", index=False)
@@ -0,0 +1,78 @@
+# models/batch_ar.py
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Vectorized AR(p) / ARI(p, d) for many series at once: every series is differenced d
+# times, its lag matrix stacked into one (series, rows, p + 1) array, and all the
+# least-squares fits solved in one batched call. Forecasts run the AR recursion for
+# all series together, one step per day, then undo the differencing.
+#
+# Series are rows of a 2-D array, right-aligned on their last observation; shorter
+# series are left-padded with NaN and lag rows touching the padding are ignored.
+
+# Singular values below this fraction of the largest are dropped in the least-squares solve
+RCOND = 1e-10
+
+
+def stack_series(series: list) -> np.ndarray:
+    """(n_series, longest) float64 array, each series right-aligned and NaN-padded on the left."""
+    width = max(len(values) for values in series)
+    Y = np.full((len(series), width), np.nan)
+    for row, values in enumerate(series):
+        if len(values):
+            Y[row, width - len(values):] = np.asarray(values, dtype="float64")
+    return Y
+
+
+def _lag_design(Y, p, d):
+    """Differenced series, design matrices [1, lag 1..p], targets and the mask of usable rows."""
+    D = np.diff(Y, n=d, axis=1) if d else Y
+    windows = sliding_window_view(D, p + 1, axis=1)          # (B, M, p + 1), oldest first
+    target = windows[..., -1]
+    lags = windows[..., -2::-1] if p else windows[..., :0]   # most recent lag first
+    X = np.concatenate([np.ones(target.shape + (1,)), lags], axis=-1)
+    usable = np.isfinite(windows).all(axis=-1)
+    return D, X, target, usable
+
+
+def fit_ar(Y: np.ndarray, p: int, d: int = 0) -> np.ndarray:
+    """
+    Least-squares AR(p) coefficients [intercept, phi_1..phi_p] on the d-times differenced
+    rows of Y, shape (n_series, p + 1). Rows without enough observations get NaN.
+    """
+    _, X, target, usable = _lag_design(Y, p, d)
+    weights = usable[..., None]
+    Xw = np.where(weights, X, 0.0)
+    yw = np.where(usable, target, 0.0)
+    # Batched SVD-based least squares: stable on collinear lags, minimum-norm on flat series
+    coef = np.einsum("bim,bm->bi", np.linalg.pinv(Xw, rcond=RCOND), yw)
+    coef[usable.sum(axis=1) < p + 2] = np.nan
+    return coef
+
+
+def predict_in_sample(Y: np.ndarray, coef: np.ndarray, p: int, d: int = 0) -> np.ndarray:
+    """One-step-ahead fitted values on the original scale, aligned with Y (NaN where undefined)."""
+    _, X, target, usable = _lag_design(Y, p, d)
+    residual = target - np.einsum("bmi,bi->bm", X, coef)
+    fitted = np.full(Y.shape, np.nan)
+    # d-th difference of y_t = y_t + terms in earlier y, so the level fit is y_t minus the residual
+    fitted[:, p + d:] = np.where(usable, Y[:, p + d:] - residual, np.nan)
+    return fitted
+
+
+def forecast_ar(Y: np.ndarray, coef: np.ndarray, p: int, d: int, horizon: int) -> np.ndarray:
+    """Recursive forecasts for every row, shape (n_series, horizon), on the original scale."""
+    D = np.diff(Y, n=d, axis=1) if d else Y
+    history = D[:, D.shape[1] - p:].copy()                   # (B, p), oldest first
+    phi = coef[:, :0:-1] if p else coef[:, :0]               # reversed: oldest lag first
+    steps = np.empty((Y.shape[0], horizon))
+    for h in range(horizon):
+        steps[:, h] = coef[:, 0] + np.einsum("bi,bi->b", history, phi)
+        if p:
+            history[:, :-1] = history[:, 1:]
+            history[:, -1] = steps[:, h]
+    # Undo the differencing, innermost level first, from each level's last observed value
+    for level in range(d - 1, -1, -1):
+        last = np.diff(Y, n=level, axis=1)[:, -1] if level else Y[:, -1]
+        steps = last[:, None] + np.cumsum(steps, axis=1)
+    return steps
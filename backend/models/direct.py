@@ -0,0 +1,64 @@
+# models/direct.py
+import numpy as np
+import pandas as pd
+from xgboost import XGBRegressor
+from config import TARGET, DIRECT_HORIZON
+from data_processing.schema import model_columns
+
+# Direct multi-horizon XGBoost: one model trained on (features at t, h) -> usage at t + h,
+# so every future point comes from the last observed row in a single batched predict
+# instead of a step-by-step recursion.
+SERIES_KEYS = ["region", "resource_type"]
+# Appended to the base features: steps ahead, and the weekday being forecast
+HORIZON_FEATURES = ["horizon", "target_day_of_week"]
+
+
+def base_features(df: pd.DataFrame):
+    """Numeric feature columns (series identity is carried by the lags, not the labels)."""
+    skip = {"date", TARGET, *model_columns(df)}
+    return [col for col in df.columns if col not in skip]
+
+
+def _horizon_matrix(base: np.ndarray, dates: pd.Series, horizons) -> np.ndarray:
+    """Rows of base repeated once per horizon, with the horizon features appended."""
+    horizons = np.asarray(horizons)
+    rows = np.repeat(base, len(horizons), axis=0)
+    steps = np.tile(horizons, len(base))
+    weekday = (np.repeat(dates.dt.dayofweek.to_numpy(), len(horizons)) + steps) % 7
+    return np.column_stack([rows, steps, weekday]).astype("float64")
+
+
+def direct_training_set(df: pd.DataFrame, max_horizon: int = DIRECT_HORIZON):
+    """Stack (features at t, h) -> usage at t + h for h = 1..max_horizon within each series."""
+    df = df.sort_values(SERIES_KEYS + ["date"], kind="mergesort").reset_index(drop=True)
+    features = base_features(df)
+    base = df[features].to_numpy(dtype="float64")
+    series = df.groupby(SERIES_KEYS, observed=True, sort=False)[TARGET]
+
+    blocks, targets = [], []
+    for h in range(1, max_horizon + 1):
+        target = series.shift(-h).to_numpy(dtype="float64")
+        keep = ~np.isnan(target)
+        blocks.append(_horizon_matrix(base[keep], df["date"][keep], [h]))
+        targets.append(target[keep])
+    X = pd.DataFrame(np.concatenate(blocks), columns=features + HORIZON_FEATURES)
+    return X, np.concatenate(targets)
+
+
+def train_direct(df: pd.DataFrame, max_horizon: int = DIRECT_HORIZON) -> XGBRegressor:
+    X, y = direct_training_set(df, max_horizon)
+    model = XGBRegressor(n_estimators=200, max_depth=5, learning_rate=0.1)
+    model.fit(X, y)
+    model.max_horizon_ = max_horizon
+    return model
+
+
+def direct_predictions(model: XGBRegressor, rows: pd.DataFrame, horizon: int) -> np.ndarray:
+    """
+    (len(rows), horizon) predictions for h = 1..horizon from each row's features, in one
+    booster call. Rows can come from any number of series.
+    """
+    features = [col for col in model.feature_names_in_ if col not in HORIZON_FEATURES]
+    base = rows.reindex(columns=features).to_numpy(dtype="float64")
+    X = _horizon_matrix(base, rows["date"], np.arange(1, horizon + 1))
+    return model.get_booster().inplace_predict(X).reshape(len(rows), horizon)
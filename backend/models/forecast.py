@@ -1,13 +1,10 @@
 from pathlib import Path
 import pandas as pd
 import numpy as np
-from statsmodels.tsa.arima.model import ARIMA
 from xgboost import XGBRegressor
 from sklearn.preprocessing import MinMaxScaler, LabelEncoder
-from tensorflow.keras.models import load_model
 from fastapi import HTTPException
-import joblib
-import tensorflow as tf
+import re
 import warnings
 import sys
 from datetime import datetime
@@ -15,14 +12,34 @@ import os
 
 
 sys.path.append("C:/Users/Sakshi Singhania/Desktop/milestone2/Project/backend")
-from config import DATA_PATH, MODEL_PATH_LSTM, TARGET, WINDOW, LSTM_FEATURES, MODEL_PATH_XGB
+from config import TARGET, WINDOW, XGBOOST_FEATURES, LSTM_FEATURES, DIRECT_HORIZON, BATCH_AR_ORDER
+from data_processing.dataset import get_dataset, get_index, dataset_version
+from data_processing.schema import model_columns
+from utils.json_utils import frame_records
+from models.registry import get_model, artifact_version, SERVED_LSTM
+from models.lstm_numpy import NumpyLSTM
+from models import forecast_cache, forecast_db
+from models.direct import direct_predictions
+from models.arima_state import arima_results, daily_series, state_version as arima_state_version
+from models.batch_ar import stack_series, fit_ar, predict_in_sample, forecast_ar
 
 warnings.simplefilter(action='ignore', category=FutureWarning)
 
+# How XGBoost produces future points: step by step from its own predictions, or
+# all at once from the horizon-indexed direct model (models/direct.py)
+XGBOOST_STRATEGIES = ("recursive", "direct")
+# Registry artifact behind each (model, strategy); ARIMA fits are per series (models/arima_state.py)
+FORECAST_ARTIFACTS = {
+    ("xgboost", "recursive"): "xgboost",
+    ("xgboost", "direct"): "xgboost_direct",
+    ("lstm", "recursive"): SERVED_LSTM,
+}
+
 # ------------------------------
 def evaluate(y_true, y_pred):
-    y_true = np.array(y_true)
-    y_pred = np.array(y_pred)
+    # float64 so the rounded metrics stay JSON-serialisable when inputs are float32
+    y_true = np.array(y_true, dtype="float64")
+    y_pred = np.array(y_pred, dtype="float64")
     return {
         "MAE": round(np.mean(np.abs(y_true - y_pred)), 2),
         "RMSE": round(np.sqrt(np.mean((y_true - y_pred) ** 2)), 2),
@@ -36,72 +53,161 @@ def normalize_forecast(df):
     df["date"] = pd.to_datetime(df["date"]).astype(str)
     return df
 
-def sanitize_dataframe(df):
-    df.replace([np.inf, -np.inf], np.nan, inplace=True)
-    df = df.where(pd.notnull(df), None)
-
-    def safe_convert(val):
-        if isinstance(val, float):
-            if val is None or np.isnan(val) or np.isinf(val):
-                return None
-            if abs(val) > 1e308:
-                return float(1e308) if val > 0 else float(-1e308)
-            return float(val)
-        if isinstance(val, (np.float32, np.float64)):
-            return float(val)
-        if isinstance(val, (np.int32, np.int64)):
-            return int(val)
-        return val
-
-    return df.astype(object).applymap(safe_convert)
-
-def filter_data(df, region, resource_type):
-    df = df[(df["region"] == region) & (df["resource_type"] == resource_type)].sort_values("date")
-    return df
+def filter_data(region, resource_type):
+    # Index slices are already ordered by date within a series
+    return get_index().query(region=region, resource_type=resource_type)
 
 # ------------------------------
 def run_arima(df, horizon):
     try:
-        train_size = int(len(df) * 0.8)
-        train = df[:train_size].copy()
-        model = ARIMA(train[TARGET], order=(5, 1, 0))
-        model_fit = model.fit()
+        # Persisted per-series fit, extended with new days instead of refitted (models/arima_state.py)
+        results = arima_results(str(df["region"].iloc[0]), str(df["resource_type"].iloc[0]), df)
 
-        historical_preds = model_fit.predict(start=train.index[0], end=train.index[-1])
-        historical = df[["date", TARGET]].rename(columns={TARGET: "actual"})
-        historical["predicted"] = historical_preds
+        # One-step-ahead in-sample predictions; the first d days have no usable history
+        fitted = results.fittedvalues.copy()
+        fitted.iloc[:results.model.k_diff] = np.nan
+        return _series_forecast(df, fitted, results.forecast(steps=horizon).to_numpy())
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"ARIMA error: {str(e)}")
 
-        forecast = model_fit.forecast(steps=horizon)
-        future_dates = pd.date_range(df["date"].max() + pd.Timedelta(days=1), periods=horizon)
-        future = pd.DataFrame({"date": future_dates, "predicted": forecast})
-        future["actual"] = None
 
-        metrics = {}
-        if historical["actual"].notna().sum() > 0:
-            metrics = evaluate(historical["actual"].dropna(), historical["predicted"].dropna())
+def _series_forecast(df, fitted, future_values):
+    """Forecast frame and metrics from date-indexed in-sample predictions and the future values."""
+    historical = df[["date", TARGET]].rename(columns={TARGET: "actual"})
+    historical["predicted"] = fitted.reindex(pd.DatetimeIndex(historical["date"])).to_numpy()
 
-        return pd.concat([historical, future], ignore_index=True), metrics
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"ARIMA error: {str(e)}")
+    future_dates = pd.date_range(df["date"].max() + pd.Timedelta(days=1), periods=len(future_values))
+    future = pd.DataFrame({"date": future_dates, "predicted": future_values})
+    future["actual"] = None
+
+    metrics = {}
+    scored = historical["actual"].notna() & historical["predicted"].notna()
+    if scored.any():
+        metrics = evaluate(historical.loc[scored, "actual"], historical.loc[scored, "predicted"])
+
+    return pd.concat([historical, future], ignore_index=True), metrics
 
 # ------------------------------
-def run_xgboost(df, horizon):
+# Fast AR tier: least-squares ARI(p, d) for many series in one batched fit (models/batch_ar.py)
+def ar_forecasts(frames: dict, horizon: int) -> dict:
+    """
+    {key: one series' rows} -> {key: (forecast frame, metrics)}, fitted and forecast for
+    all series together. Series too short for the AR order are left out.
+    """
+    keys = list(frames)
+    if not keys:
+        return {}
+    series = [daily_series(frames[key]) for key in keys]
+    Y = stack_series([values.to_numpy() for values in series])
+    p, d = BATCH_AR_ORDER
+    coef = fit_ar(Y, p, d)
+    fitted = predict_in_sample(Y, coef, p, d)
+    future = forecast_ar(Y, coef, p, d, horizon)
+
+    results = {}
+    for row, key in enumerate(keys):
+        if np.isnan(coef[row]).any():
+            continue
+        in_sample = pd.Series(fitted[row, Y.shape[1] - len(series[row]):], index=series[row].index)
+        results[key] = _series_forecast(frames[key], in_sample, future[row])
+    return results
+
+
+def run_ar(df, horizon):
+    results = ar_forecasts({"series": df}, horizon)
+    if "series" not in results:
+        raise HTTPException(status_code=500, detail=f"AR error: not enough observations for order {BATCH_AR_ORDER}")
+    return results["series"]
+
+# ------------------------------
+# Recursive XGBoost forecaster: one preallocated feature row updated in place from
+# the model's own predictions, scored with a single booster call per step.
+_LAG_FEATURE = re.compile(r"cpu_lag_(\d+)$")
+_ROLL_FEATURE = re.compile(r"cpu_roll_(mean|max|min)_(\d+)$")
+_ROLL_REDUCE = {"mean": np.mean, "max": np.max, "min": np.min}
+
+
+def _utilization_capacity(X, y):
+    """CPU capacity behind utilization_ratio (usage_cpu / capacity), recovered from the history."""
+    ratio = X["utilization_ratio"].to_numpy(dtype="float64")
+    usage = np.asarray(y, dtype="float64")
+    valid = (ratio > 0) & np.isfinite(usage)
+    return float(np.median(usage[valid] / ratio[valid])) if valid.any() else None
+
+
+def xgboost_future(model, scaler, X, y, last_date, horizon):
+    """
+    Yield (date, prediction) for each future day. Lags, rolling windows and
+    utilization_ratio are recomputed from the observed + predicted series; features that
+    involve the day's own usage use the series up to the previous day. Calendar fields
+    follow the date and the remaining metrics carry their last observed value forward.
+    """
+    columns = {col: i for i, col in enumerate(X.columns)}
+    row = X.iloc[-1].to_numpy(dtype="float64").copy()
+    scaled = np.empty_like(row)
+
+    lags = [(i, int(m.group(1))) for col, i in columns.items() if (m := _LAG_FEATURE.match(col))]
+    rolls = [(i, _ROLL_REDUCE[m.group(1)], int(m.group(2))) for col, i in columns.items() if (m := _ROLL_FEATURE.match(col))]
+    look_back = max([k for _, k in lags] + [w for _, _, w in rolls] + [1])
+    observed = np.asarray(y, dtype="float64")[-look_back:]
+    values = np.empty(len(observed) + horizon)
+    values[:len(observed)] = observed
+    pos = len(observed)
+
+    capacity = _utilization_capacity(X, y) if "utilization_ratio" in columns else None
+    calendar = {
+        "day_of_week": lambda d: d.dayofweek,
+        "month": lambda d: d.month,
+        "quarter": lambda d: d.quarter,
+        "year": lambda d: d.year,
+        "is_weekend": lambda d: float(d.dayofweek >= 5),
+    }
+    calendar = [(columns[col], fn) for col, fn in calendar.items() if col in columns]
+
+    booster = model.get_booster()
+    for step in range(1, horizon + 1):
+        date = last_date + pd.Timedelta(days=step)
+        for i, k in lags:
+            row[i] = values[pos - k] if pos >= k else np.nan
+        for i, reduce, window in rolls:
+            row[i] = reduce(values[max(pos - window, 0):pos])
+        if capacity:
+            row[columns["utilization_ratio"]] = values[pos - 1] / capacity
+        for i, fn in calendar:
+            row[i] = fn(date)
+
+        # MinMaxScaler.transform, without the per-call validation
+        np.multiply(row, scaler.scale_, out=scaled)
+        scaled += scaler.min_
+        y_pred = booster.inplace_predict(scaled[None, :])[0]
+
+        values[pos] = y_pred
+        pos += 1
+        yield date, y_pred
+
+
+# ------------------------------
+def xgboost_features(model):
+    """Columns the recursive model was trained on, in order; extra dataset columns are never fed to it."""
+    names = getattr(model, "feature_names_in_", None)
+    return list(names) if names is not None else XGBOOST_FEATURES
+
+
+def xgboost_parts(df, horizon):
+    """(historical frame, metrics, generator of future (date, prediction)) for the recursive XGBoost forecast."""
     try:
-        model = joblib.load(MODEL_PATH_XGB)
+        model = get_model("xgboost")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"XGBoost model load error: {str(e)}")
 
     df = df.sort_values("date").copy()
     df["date"] = pd.to_datetime(df["date"])
 
-    encoders = {}
     df_encoded = df.copy()
-    for col in df_encoded.select_dtypes(include="object").columns:
-        le = LabelEncoder()
-        df_encoded[col] = le.fit_transform(df_encoded[col].astype(str))
-        encoders[col] = le
+    for col in model_columns(df_encoded):
+        df_encoded[col] = LabelEncoder().fit_transform(df_encoded[col].astype(str))
 
-    X = df_encoded.drop(columns=["date", TARGET])
+    X = df_encoded.reindex(columns=xgboost_features(model)).astype("float64")
     scaler = MinMaxScaler()
     X_scaled = scaler.fit_transform(X)
 
@@ -109,49 +215,109 @@ def run_xgboost(df, horizon):
     historical = df[["date", TARGET]].rename(columns={TARGET: "actual"})
     historical["predicted"] = y_preds
 
-    last_row = df.iloc[-1]
-    future_rows = []
+    metrics = {}
+    if historical["actual"].notna().sum() > 0:
+        metrics = evaluate(historical["actual"].dropna(), historical["predicted"].dropna())
+
+    return historical, metrics, xgboost_future(model, scaler, X, df[TARGET], df["date"].max(), horizon)
 
-    for i in range(horizon):
-        next_date = last_row["date"] + pd.Timedelta(days=1)
-        input_row = last_row.copy()
-        input_row["date"] = next_date
-        input_df = pd.DataFrame([input_row])
 
-        for col in input_df.select_dtypes(include="object").columns:
-            if col in encoders:
-                le = encoders[col]
-                try:
-                    input_df[col] = le.transform(input_df[col].astype(str))
-                except ValueError as e:
-                    raise HTTPException(status_code=500, detail=f"Label encoding error in column '{col}': {str(e)}")
+def run_xgboost(df, horizon):
+    historical, metrics, future_points = xgboost_parts(df, horizon)
+    try:
+        future_rows = [{"date": date, "predicted": y_pred} for date, y_pred in future_points]
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"XGBoost prediction error: {str(e)}")
 
-        X_input = input_df.drop(columns=["date", TARGET])
-        X_input_scaled = scaler.transform(X_input)
+    future = pd.DataFrame(future_rows)
+    future["actual"] = None
+    return pd.concat([historical, future], ignore_index=True), metrics
 
-        try:
-            y_pred = model.predict(X_input_scaled)[0]
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"XGBoost prediction error: {str(e)}")
+# ------------------------------
+def run_xgboost_direct(df, horizon):
+    try:
+        model = get_model("xgboost_direct")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"XGBoost direct model load error: {str(e)}")
 
-        new_row = {"date": next_date, TARGET: y_pred}
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-        last_row = df.iloc[-1]
-        future_rows.append({"date": next_date, "predicted": y_pred})
+    df = df.sort_values("date").reset_index(drop=True)
+    df["date"] = pd.to_datetime(df["date"])
 
-    future = pd.DataFrame(future_rows)
+    # Historical block: one-day-ahead predictions from the previous day's features
+    predicted = np.full(len(df), np.nan)
+    if len(df) > 1:
+        predicted[1:] = direct_predictions(model, df.iloc[:-1], 1)[:, 0]
+    historical = df[["date", TARGET]].rename(columns={TARGET: "actual"})
+    historical["predicted"] = predicted
+
+    future = pd.DataFrame({
+        "date": pd.date_range(df["date"].max() + pd.Timedelta(days=1), periods=horizon),
+        "predicted": direct_predictions(model, df.iloc[[-1]], horizon)[0],
+    })
     future["actual"] = None
 
     metrics = {}
-    if historical["actual"].notna().sum() > 0:
-        metrics = evaluate(historical["actual"].dropna(), historical["predicted"].dropna())
+    scored = historical["actual"].notna() & historical["predicted"].notna()
+    if scored.any():
+        metrics = evaluate(historical.loc[scored, "actual"], historical.loc[scored, "predicted"])
 
     return pd.concat([historical, future], ignore_index=True), metrics
 
 # ------------------------------
-def run_lstm(df, horizon):
+# Recursive LSTM forecaster: one compiled forward pass per step over a
+# preallocated, already-scaled window, instead of model.predict + pd.concat.
+_lstm_step = {}  # "current" -> (model, compiled single-step function)
+
+
+def _lstm_step_fn(model):
+    """Forward pass for one (1, WINDOW, features) sequence; a Keras model is traced once per served model."""
+    if isinstance(model, NumpyLSTM):
+        return model.predict
+    current = _lstm_step.get("current")
+    if current is None or current[0] is not model:
+        import tensorflow as tf
+
+        def forward(x):
+            return model(x, training=False)
+
+        spec = tf.TensorSpec((1, WINDOW, len(LSTM_FEATURES)), tf.float32)
+        warmup = np.zeros((1, WINDOW, len(LSTM_FEATURES)), dtype=np.float32)
+        try:
+            # XLA fuses the recurrent loop; roughly 3x faster per step than the plain graph on CPU
+            fn = tf.function(forward, input_signature=[spec], jit_compile=True, autograph=False)
+            fn(warmup)
+        except Exception:
+            fn = tf.function(forward, input_signature=[spec], autograph=False)
+        current = (model, fn)
+        _lstm_step["current"] = current
+    return current[1]
+
+
+def lstm_future(model, scaler, df, horizon):
+    """
+    Yield (date, prediction) for each future day. Each step appends the last observed
+    feature row to the window again (only the target is forecast), so the row is scaled once.
+    """
+    step = _lstm_step_fn(model)
+    # Every row is stored twice, so the current window is always the contiguous slice ring[head:head + WINDOW]
+    ring = np.empty((2 * WINDOW, len(LSTM_FEATURES)), dtype=np.float32)
+    ring[:WINDOW] = ring[WINDOW:] = scaler.transform(df[LSTM_FEATURES].iloc[-WINDOW:])
+    carried = ring[WINDOW - 1].copy()
+    last_date = df["date"].max()
+    head = 0
+    for i in range(1, horizon + 1):
+        y_pred = np.asarray(step(ring[None, head:head + WINDOW]))[0, 0]
+        ring[head] = ring[head + WINDOW] = carried
+        head = (head + 1) % WINDOW
+        yield last_date + pd.Timedelta(days=i), y_pred
+
+
+# ------------------------------
+def lstm_parts(df, horizon):
+    """(historical frame, metrics, generator of future (date, prediction)) for the LSTM forecast."""
     try:
-        model = load_model(MODEL_PATH_LSTM, compile=False)
+        # The NumPy export unless LSTM_BACKEND = "keras" (models/lstm_numpy.py)
+        model = get_model(SERVED_LSTM)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Model load error: {str(e)}")
 
@@ -173,78 +339,206 @@ def run_lstm(df, horizon):
     historical = historical[["date", TARGET]].rename(columns={TARGET: "actual"})
     historical["predicted"] = y_preds
 
-    df_copy = df.copy()
-    future_rows = []
-    for _ in range(horizon):
-        if len(df_copy) < WINDOW:
-            raise HTTPException(status_code=500, detail="Insufficient data for LSTM window")
-
-        X_seq = df_copy[-WINDOW:][LSTM_FEATURES]
-        X_scaled = scaler.transform(X_seq)
-        X_input = X_scaled.reshape(1, WINDOW, len(LSTM_FEATURES))
-
-        y_pred = model.predict(X_input)[0][0]
-        next_date = df_copy["date"].max() + pd.Timedelta(days=1)
-
-        new_row = df_copy.iloc[-1][LSTM_FEATURES].to_dict()
-        new_row["date"] = next_date
-        new_row[TARGET] = y_pred
-
-        df_copy = pd.concat([df_copy, pd.DataFrame([new_row])], ignore_index=True)
-        future_rows.append({"date": next_date, "predicted": y_pred})
-
-    future = pd.DataFrame(future_rows)
-    future["actual"] = None
+    if len(df) < WINDOW:
+        raise HTTPException(status_code=500, detail="Insufficient data for LSTM window")
 
     metrics = {}
     if historical["actual"].notna().sum() > 0:
         metrics = evaluate(historical["actual"].dropna(), historical["predicted"].dropna())
 
+    return historical, metrics, lstm_future(model, scaler, df, horizon)
+
+
+def run_lstm(df, horizon):
+    historical, metrics, future_points = lstm_parts(df, horizon)
+    future = pd.DataFrame([{"date": date, "predicted": y_pred} for date, y_pred in future_points])
+    future["actual"] = None
     return pd.concat([historical, future], ignore_index=True), metrics
 
 
 # ------------------------------
-def forecast(region: str, service: str, model: str = "xgboost", horizon: int = 30) -> dict:
-    print(f"Incoming request: region={region}, resource_type={service}, model={model}")
+def forecast_versions(model: str, strategy: str = "recursive"):
+    """What a forecast is computed from: the dataset version and the served model artifact's version."""
+    if model == "arima":
+        return dataset_version(), arima_state_version()
+    artifact = FORECAST_ARTIFACTS.get((model, strategy))
+    return dataset_version(), artifact_version(artifact) if artifact else None
+
+
+def forecast_frame(region: str, service: str, model: str = "xgboost", horizon: int = 30, strategy: str = "recursive"):
+    """
+    (forecast DataFrame with date/actual/predicted/bounds, metrics) for one series.
+    Results are cached per series/model and reused until the data or model changes.
+    """
+    print(f"Incoming request: region={region}, resource_type={service}, model={model}, strategy={strategy}")
+    validate_strategy(model, horizon, strategy)
+    model = model.lower()
+
+    key = (region, service, model, strategy)
     try:
-        df = pd.read_csv(DATA_PATH, parse_dates=["date"])
+        versions = forecast_versions(model, strategy)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Data load error: {str(e)}")
+    cached = forecast_cache.get(key, versions, horizon)
+    if cached is not None:
+        return cached
 
-    print(f"Available columns: {df.columns.tolist()}")
-    df_filtered = filter_data(df, region, service)
+    df_filtered = series_rows(region, service)
+    try:
+        forecast_df, metrics = compute_forecast(df_filtered, model, horizon, strategy)
+    except Exception as e:
+        print(f"❌ Forecast model error: {e}")
+        raise HTTPException(status_code=500, detail=f"Model execution failed: {str(e)}")
+
+    print(f"Forecast columns: {forecast_df.columns.tolist()}")
+    forecast_cache.put(key, versions, horizon, forecast_df, metrics)
+    return forecast_df, metrics
+
+
+def series_rows(region: str, service: str):
+    """The series' dataset rows; 404 when there are too few to forecast from."""
+    try:
+        df_filtered = filter_data(region, service)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Data load error: {str(e)}")
+
+    print(f"Available columns: {df_filtered.columns.tolist()}")
     print(f"Filtered rows: {len(df_filtered)}")
 
     if df_filtered is None or len(df_filtered) < 50:
         raise HTTPException(status_code=404, detail=f"No data available for region={region}, resource_type={service}")
-
-    model = model.lower()
+    return df_filtered
+
+
+# Models whose forecasts for many series come from one batched call: {model: fn(frames, horizon)}
+BATCH_MODELS = {"ar": ar_forecasts}
+
+
+def compute_forecast(df_filtered, model: str, horizon: int, strategy: str = "recursive"):
+    """Run one model over one series' rows: (forecast frame with bounds, metrics). No caching."""
+    if model == "arima":
+        forecast_df, metrics = run_arima(df_filtered, horizon)
+    elif model == "ar":
+        forecast_df, metrics = run_ar(df_filtered, horizon)
+    elif model == "xgboost":
+        run = run_xgboost_direct if strategy == "direct" else run_xgboost
+        forecast_df, metrics = run(df_filtered, horizon)
+    elif model == "lstm":
+        forecast_df, metrics = run_lstm(df_filtered, horizon)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported model: {model}")
+    return normalize_forecast(forecast_df), metrics
+
+
+def validate_strategy(model: str, horizon: int, strategy: str):
+    if strategy not in XGBOOST_STRATEGIES:
+        raise HTTPException(status_code=400, detail=f"Unsupported strategy: {strategy}. Use one of {', '.join(XGBOOST_STRATEGIES)}")
+    if strategy == "direct":
+        if model.lower() != "xgboost":
+            raise HTTPException(status_code=400, detail="The direct strategy is only available for xgboost")
+        if horizon > DIRECT_HORIZON:
+            raise HTTPException(status_code=400, detail=f"The direct strategy is trained for horizons up to {DIRECT_HORIZON}")
+
+
+def served_forecast(region: str, service: str, model: str = "xgboost", horizon: int = 30,
+                    strategy: str = "recursive", live: bool = False):
+    """
+    (forecast frame, metrics, source). Answered from the scheduled forecast store when it
+    holds a current run covering horizon; computed on demand (source "live") when asked
+    with live=True or when the store can't answer.
+    """
+    if not live:
+        stored = stored_forecast(region, service, model, horizon, strategy)
+        if stored is not None:
+            return stored[0], stored[1], "store"
+    forecast_df, metrics = forecast_frame(region, service, model, horizon, strategy)
+    return forecast_df, metrics, "live"
+
+
+def stored_forecast(region: str, service: str, model: str = "xgboost", horizon: int = 30, strategy: str = "recursive"):
+    """(frame, metrics) from the forecast store, or None if it has no current run covering horizon."""
+    validate_strategy(model, horizon, strategy)
     try:
-        if model == "arima":
-            forecast_df, metrics = run_arima(df_filtered, horizon)
-        elif model == "xgboost":
-            forecast_df, metrics = run_xgboost(df_filtered, horizon)
-        elif model == "lstm":
-            forecast_df, metrics = run_lstm(df_filtered, horizon)
-        else:
-            raise HTTPException(status_code=400, detail=f"Unsupported model: {model}")
+        return forecast_db.read_forecast(
+            region, service, model.lower(), strategy, horizon, forecast_versions(model.lower(), strategy)
+        )
     except Exception as e:
-        print(f"❌ Forecast model error: {e}")
-        raise HTTPException(status_code=500, detail=f"Model execution failed: {str(e)}")
+        print(f"⚠️ Forecast store unavailable, computing live: {e}")
+        return None
 
-    print(f"Forecast columns: {forecast_df.columns.tolist()}")
-    forecast_df = normalize_forecast(forecast_df)
-    forecast_df = sanitize_dataframe(forecast_df)
 
+def forecast(region: str, service: str, model: str = "xgboost", horizon: int = 30,
+             strategy: str = "recursive", live: bool = False) -> dict:
+    forecast_df, metrics, _ = served_forecast(region, service, model, horizon, strategy, live)
     return {
-        "forecast": forecast_df.to_dict(orient="records"),
+        # NaN/inf -> None, column-wise
+        "forecast": frame_records(forecast_df),
         "metrics": metrics
     }
 
 
+# ------------------------------
+# Streaming: a recursive model's historical block is complete before its first future
+# step runs, so it can be sent first and the future points as the loop produces them.
+STREAMING_PARTS = {("xgboost", "recursive"): xgboost_parts, ("lstm", "recursive"): lstm_parts}
+
+
+def _future_row(date, y_pred) -> dict:
+    # The values normalize_forecast + frame_records give the same point in a full forecast
+    return {
+        "date": date.strftime("%Y-%m-%d"),
+        "actual": None,
+        "predicted": float(y_pred),
+        "upper_bound": float(y_pred * 1.05),
+        "lower_bound": float(y_pred * 0.95),
+    }
+
+
+def _streamed_points(key, versions, horizon, historical, metrics, future_points):
+    rows = []
+    for date, y_pred in future_points:
+        rows.append({"date": date, "predicted": y_pred})
+        yield _future_row(date, y_pred)
+    # Complete: cached like any other live forecast
+    future = pd.DataFrame(rows)
+    future["actual"] = None
+    forecast_df = normalize_forecast(pd.concat([historical, future], ignore_index=True))
+    forecast_cache.put(key, versions, horizon, forecast_df, metrics)
+
+
+def forecast_stream(region: str, service: str, model: str = "xgboost", horizon: int = 30,
+                    strategy: str = "recursive", live: bool = False):
+    """
+    (historical frame, metrics, iterator of future row dicts, source). A live recursive
+    XGBoost/LSTM forecast yields each future point as it is computed; stored, cached and
+    other forecasts are computed whole and their future rows replayed.
+    """
+    validate_strategy(model, horizon, strategy)
+    model = model.lower()
+    parts = STREAMING_PARTS.get((model, strategy))
+    key = (region, service, model, strategy)
+    versions = forecast_versions(model, strategy)
+
+    complete = None if live else stored_forecast(region, service, model, horizon, strategy)
+    source = "store" if complete is not None else "live"
+    if complete is None and parts is not None:
+        complete = forecast_cache.get(key, versions, horizon)
+    if complete is None and parts is None:
+        complete = forecast_frame(region, service, model, horizon, strategy)
+    if complete is not None:
+        forecast_df, metrics = complete
+        history = len(forecast_df) - horizon
+        return forecast_df.iloc[:history], metrics, iter(frame_records(forecast_df.iloc[history:])), source
+
+    print(f"Incoming stream request: region={region}, resource_type={service}, model={model}, strategy={strategy}")
+    historical, metrics, future_points = parts(series_rows(region, service), horizon)
+    points = _streamed_points(key, versions, horizon, historical, metrics, future_points)
+    return normalize_forecast(historical.copy()), metrics, points, source
+
+
 def get_valid_combinations():
     try:
-        df = pd.read_csv(DATA_PATH)
+        df = get_dataset()
         combos = df[["region", "resource_type"]].dropna().drop_duplicates()
         return combos.to_dict(orient="records")
     except Exception as e:
@@ -0,0 +1,72 @@
+# models/forecast_cache.py
+import threading
+import time
+from collections import OrderedDict
+from config import FORECAST_CACHE_SIZE, FORECAST_CACHE_TTL
+
+# Forecast results per (region, service, model, strategy): a bounded LRU with a TTL.
+# An entry is valid only for the dataset/model versions it was computed from, and a
+# shorter horizon is served from the first rows of a longer cached one (future
+# points never depend on how far ahead the forecast runs).
+
+_lock = threading.Lock()
+_entries = OrderedDict()  # key -> {"versions", "horizon", "history", "frame", "metrics", "created"}
+_stats = {"hits": 0, "prefix_hits": 0, "misses": 0, "stale": 0, "expired": 0, "evictions": 0}
+
+
+def get(key, versions, horizon):
+    """(forecast frame, metrics) for horizon, or None on a miss."""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry["versions"] != versions:
+            del _entries[key]
+            _stats["stale"] += 1
+            entry = None
+        elif entry is not None and now - entry["created"] > FORECAST_CACHE_TTL:
+            del _entries[key]
+            _stats["expired"] += 1
+            entry = None
+        if entry is None or entry["horizon"] < horizon:
+            _stats["misses"] += 1
+            return None
+        _entries.move_to_end(key)
+        _stats["hits" if entry["horizon"] == horizon else "prefix_hits"] += 1
+    return entry["frame"].iloc[:entry["history"] + horizon].copy(), dict(entry["metrics"])
+
+
+def put(key, versions, horizon, frame, metrics):
+    """Cache a forecast whose last `horizon` rows are the future points."""
+    with _lock:
+        current = _entries.get(key)
+        if current is not None and current["versions"] == versions and current["horizon"] >= horizon:
+            # Keep the longer forecast; it already covers this one
+            return
+        _entries[key] = {
+            "versions": versions,
+            "horizon": horizon,
+            "history": len(frame) - horizon,
+            "frame": frame.copy(),
+            "metrics": dict(metrics),
+            "created": time.monotonic(),
+        }
+        _entries.move_to_end(key)
+        while len(_entries) > FORECAST_CACHE_SIZE:
+            _entries.popitem(last=False)
+            _stats["evictions"] += 1
+
+
+def clear():
+    with _lock:
+        _entries.clear()
+
+
+def cache_stats() -> dict:
+    with _lock:
+        stats = dict(_stats)
+        stats["size"] = len(_entries)
+    lookups = stats["hits"] + stats["prefix_hits"] + stats["misses"]
+    stats["hit_rate"] = round((stats["hits"] + stats["prefix_hits"]) / lookups, 4) if lookups else None
+    stats["max_size"] = FORECAST_CACHE_SIZE
+    stats["ttl_seconds"] = FORECAST_CACHE_TTL
+    return stats
@@ -0,0 +1,105 @@
+# models/forecast_db.py
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing
+import pandas as pd
+from config import FORECAST_DB
+from utils.json_utils import frame_columns
+
+# Indexed store of precomputed forecasts: the scheduled job publishes the latest run per
+# (region, resource_type, model, strategy) and /api/forecast answers from it.
+# Points are keyed by series + date, so a read is one index range scan.
+
+POINT_COLUMNS = ["date", "actual", "predicted", "upper_bound", "lower_bound"]
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecast_runs (
+    region TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    model TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    horizon INTEGER NOT NULL,
+    history INTEGER NOT NULL,
+    dataset_version TEXT,
+    model_version TEXT,
+    metrics TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (region, resource_type, model, strategy)
+);
+CREATE TABLE IF NOT EXISTS forecast_points (
+    region TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    model TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    date TEXT NOT NULL,
+    actual REAL,
+    predicted REAL,
+    upper_bound REAL,
+    lower_bound REAL,
+    PRIMARY KEY (region, resource_type, model, strategy, date)
+) WITHOUT ROWID;
+"""
+_KEY = "region = ? AND resource_type = ? AND model = ? AND strategy = ?"
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    global _initialized
+    FORECAST_DB.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(FORECAST_DB, timeout=30)
+    if not _initialized:
+        with _init_lock:
+            conn.executescript(SCHEMA)
+            _initialized = True
+    return conn
+
+
+def publish_forecast(region, service, model, strategy, horizon, versions, frame: pd.DataFrame, metrics: dict):
+    """Replace the stored run for this series/model with frame (whose last `horizon` rows are the future)."""
+    key = (region, service, model, strategy)
+    columns = frame_columns(frame[POINT_COLUMNS])
+    points = [key + row for row in zip(*(columns[col] for col in POINT_COLUMNS))]
+    dataset_version, model_version = versions
+    with closing(_connect()) as conn, conn:
+        conn.execute(f"DELETE FROM forecast_points WHERE {_KEY}", key)
+        conn.executemany("INSERT INTO forecast_points VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", points)
+        conn.execute(
+            "INSERT OR REPLACE INTO forecast_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            key + (horizon, len(frame) - horizon, dataset_version, model_version, json.dumps(metrics), time.time()),
+        )
+
+
+def read_forecast(region, service, model, strategy, horizon, versions):
+    """
+    (frame, metrics) from the stored run, or None when there is none, it is shorter than
+    horizon, or it was computed from a different dataset/model version.
+    """
+    key = (region, service, model, strategy)
+    with closing(_connect()) as conn:
+        run = conn.execute(
+            f"SELECT horizon, history, dataset_version, model_version, metrics FROM forecast_runs WHERE {_KEY}", key
+        ).fetchone()
+        if run is None:
+            return None
+        stored_horizon, history, dataset_version, model_version, metrics = run
+        if stored_horizon < horizon or (dataset_version, model_version) != tuple(versions):
+            return None
+        rows = conn.execute(
+            f"SELECT {', '.join(POINT_COLUMNS)} FROM forecast_points WHERE {_KEY} ORDER BY date LIMIT ?",
+            key + (history + horizon,),
+        ).fetchall()
+    return pd.DataFrame(rows, columns=POINT_COLUMNS), json.loads(metrics)
+
+
+def stored_runs() -> list:
+    """One summary row per stored run."""
+    with closing(_connect()) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "SELECT region, resource_type, model, strategy, horizon, dataset_version, model_version, created_at "
+            "FROM forecast_runs ORDER BY region, resource_type, model, strategy"
+        ).fetchall()
+    return [dict(row) for row in rows]
@@ -0,0 +1,96 @@
+# models/forecast_jobs.py
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from config import FORECAST_WORKERS, MODEL_CONCURRENCY, WORKER_THREADS
+
+# Batch forecasting for the scheduled job: the parent slices every series out of the
+# dataset once and fans (series, model) tasks out to a process pool, keeping at most
+# MODEL_CONCURRENCY[model] tasks of each model running. Workers are spawned (not forked
+# from the API process, which may already have TensorFlow running) and pinned to
+# WORKER_THREADS threads each, so TF/XGBoost/BLAS thread pools don't oversubscribe.
+
+MIN_ROWS = 50
+
+
+def available_cores() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def pool_size() -> int:
+    # One core is left to the API process
+    return FORECAST_WORKERS or max(1, available_cores() - 1)
+
+
+def init_worker():
+    threads = str(WORKER_THREADS)
+    for var in ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                "TF_NUM_INTRAOP_THREADS", "TF_NUM_INTEROP_THREADS"]:
+        os.environ[var] = threads
+    os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "2")
+
+
+def forecast_series(task):
+    """Worker: one model over one series' rows -> (task key, frame, metrics, seconds, started at)."""
+    from models.forecast import compute_forecast
+
+    key, frame, horizon = task
+    region, service, model, strategy = key
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        forecast_df, metrics = compute_forecast(frame, model, horizon, strategy)
+    except Exception as e:
+        # Re-raised as a plain error: HTTPException can't be unpickled in the parent
+        raise RuntimeError(str(e)) from None
+    return key, forecast_df, metrics, time.perf_counter() - start, started_at
+
+
+def run_forecast_jobs(series, jobs, on_result):
+    """
+    series: {(region, service): rows}; jobs: [(model, strategy, horizon)].
+    Calls on_result(key, frame, metrics) in the parent as each task finishes and returns a
+    report row per task: key, status, seconds (model time in the worker) and queued seconds
+    (from submission until a worker picked the task up).
+    """
+    pending = {}
+    report = []
+    for (region, service), frame in series.items():
+        for model, strategy, horizon in jobs:
+            key = (region, service, model, strategy)
+            if len(frame) < MIN_ROWS:
+                report.append({"key": key, "status": "skipped", "error": f"{len(frame)} rows"})
+                continue
+            pending.setdefault(model, []).append((key, frame, horizon))
+
+    running = {}  # future -> (model, key, submitted at; wall clock, comparable with the worker's)
+    per_model = {model: 0 for model in pending}
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=pool_size(), mp_context=context, initializer=init_worker) as pool:
+        while pending or running:
+            # Top every model up to its concurrency limit; tasks beyond the free workers wait in the pool's queue
+            for model in list(pending):
+                while pending[model] and per_model[model] < MODEL_CONCURRENCY.get(model, pool_size()):
+                    task = pending[model].pop(0)
+                    running[pool.submit(forecast_series, task)] = (model, task[0], time.time())
+                    per_model[model] += 1
+                if not pending[model]:
+                    del pending[model]
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                model, key, submitted = running.pop(future)
+                per_model[model] -= 1
+                row = {"key": key}
+                try:
+                    _, forecast_df, metrics, seconds, started_at = future.result()
+                    on_result(key, forecast_df, metrics)
+                    row.update(status="ok", seconds=round(seconds, 3), queued_seconds=round(max(started_at - submitted, 0), 3))
+                except Exception as e:
+                    row.update(status="failed", error=str(e))
+                report.append(row)
+    return report
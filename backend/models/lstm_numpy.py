@@ -0,0 +1,161 @@
+# models/lstm_numpy.py
+import argparse
+import json
+import numpy as np
+
+# TensorFlow-free inference for the Keras LSTM: the weights of its LSTM and Dense layers
+# are exported to a small .npz file and run with a NumPy forward pass, so serving never
+# imports TensorFlow. Weights can be stored as float16 to halve the file; the forward
+# pass always runs in float32. Dropout is an identity at inference and not exported.
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    # Same function as 1 / (1 + exp(-x)), without overflow for large negative x
+    "sigmoid": lambda x: 0.5 * (1 + np.tanh(0.5 * x)),
+}
+STORAGE_DTYPES = ("float32", "float16")
+
+
+class NumpyLSTM:
+    """Inference-only stack of LSTM/Dense layers exported from a Keras Sequential model."""
+
+    def __init__(self, layers: list, input_shape, weights_dtype: str = "float32"):
+        # layers: [{"type": "lstm"|"dense", "weights": [arrays], ...config}]
+        self.layers = layers
+        self.input_shape = tuple(input_shape)
+        self.weights_dtype = weights_dtype
+        self._runtime = [self._prepare(layer) for layer in layers]
+
+    @classmethod
+    def from_keras(cls, model, dtype: str = "float32"):
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported weight dtype: {dtype}. Use one of {', '.join(STORAGE_DTYPES)}")
+        layers = []
+        for layer in model.layers:
+            kind = type(layer).__name__
+            config = layer.get_config()
+            if kind == "Dropout":
+                continue
+            activations = [config[key] for key in ("activation", "recurrent_activation") if key in config]
+            if (not config.get("use_bias", True) or config.get("go_backwards") or config.get("stateful")
+                    or any(name not in ACTIVATIONS for name in activations)):
+                raise ValueError(f"Cannot export layer {layer.name}: unsupported bias/activation/direction settings")
+            if kind == "LSTM":
+                layers.append({
+                    "type": "lstm",
+                    "units": config["units"],
+                    "activation": config["activation"],
+                    "recurrent_activation": config["recurrent_activation"],
+                    "return_sequences": config["return_sequences"],
+                    "weights": layer.get_weights(),  # kernel, recurrent kernel, bias (gates i, f, c, o)
+                })
+            elif kind == "Dense":
+                layers.append({"type": "dense", "activation": config["activation"], "weights": layer.get_weights()})
+            else:
+                raise ValueError(f"Cannot export layer {layer.name} ({kind})")
+        for layer in layers:
+            layer["weights"] = [np.asarray(w, dtype=dtype) for w in layer["weights"]]
+        return cls(layers, model.input_shape, dtype)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            meta = json.loads(str(data["meta"]))
+            layers = []
+            for i, config in enumerate(meta["layers"]):
+                count = config.pop("n_weights")
+                config["weights"] = [data[f"layer{i}_w{j}"] for j in range(count)]
+                layers.append(config)
+        return cls(layers, meta["input_shape"], meta["weights_dtype"])
+
+    def save(self, path):
+        arrays = {}
+        layers = []
+        for i, layer in enumerate(self.layers):
+            config = {key: value for key, value in layer.items() if key != "weights"}
+            config["n_weights"] = len(layer["weights"])
+            layers.append(config)
+            for j, w in enumerate(layer["weights"]):
+                arrays[f"layer{i}_w{j}"] = np.asarray(w, dtype=self.weights_dtype)
+        meta = {"layers": layers, "input_shape": list(self.input_shape), "weights_dtype": self.weights_dtype}
+        with open(path, "wb") as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+
+    @staticmethod
+    def _prepare(layer):
+        weights = [np.asarray(w, dtype=np.float32) for w in layer["weights"]]
+        if layer["type"] != "lstm":
+            return {**layer, "weights": weights}
+        fused = layer["activation"] == "tanh" and layer["recurrent_activation"] == "sigmoid"
+        if fused:
+            # sigmoid(z) = (1 + tanh(z / 2)) / 2: with the i, f, o gate columns pre-halved,
+            # one tanh over all four gates replaces three sigmoids and a tanh per step
+            units = layer["units"]
+            scale = np.full(4 * units, 0.5, dtype=np.float32)
+            scale[2 * units:3 * units] = 1.0
+            weights = [w * scale for w in weights]
+        return {**layer, "weights": weights, "fused": fused}
+
+    def predict(self, X, verbose=0):
+        """model.predict for a (batch, timesteps, features) array -> (batch, outputs) float32."""
+        x = np.asarray(X, dtype=np.float32)
+        for layer in self._runtime:
+            if layer["type"] == "lstm":
+                x = self._lstm(layer, x)
+            else:
+                kernel, bias = layer["weights"]
+                x = ACTIVATIONS[layer["activation"]](x @ kernel + bias)
+        return x
+
+    @staticmethod
+    def _lstm(layer, x):
+        kernel, recurrent, bias = layer["weights"]
+        units = layer["units"]
+        batch, steps, _ = x.shape
+        # Input projections for every timestep in one matmul; only h @ U stays in the loop
+        projected = x @ kernel + bias
+        h = np.zeros((batch, units), dtype=np.float32)
+        c = np.zeros((batch, units), dtype=np.float32)
+        outputs = np.empty((batch, steps, units), dtype=np.float32) if layer["return_sequences"] else None
+        act = ACTIVATIONS[layer["activation"]]
+        gate = ACTIVATIONS[layer["recurrent_activation"]]
+        for t in range(steps):
+            z = projected[:, t] + h @ recurrent
+            if layer["fused"]:
+                np.tanh(z, out=z)
+                gates = 0.5 + 0.5 * z
+                c = gates[:, units:2 * units] * c + gates[:, :units] * z[:, 2 * units:3 * units]
+                h = gates[:, 3 * units:] * np.tanh(c)
+            else:
+                c = gate(z[:, units:2 * units]) * c + gate(z[:, :units]) * act(z[:, 2 * units:3 * units])
+                h = gate(z[:, 3 * units:]) * act(c)
+            if outputs is not None:
+                outputs[:, t] = h
+        return outputs if outputs is not None else h
+
+
+def export_keras_lstm(src, dest, dtype: str = "float32"):
+    """Export a saved Keras LSTM (.h5/.keras) to .npz; imports TensorFlow."""
+    from tensorflow.keras.models import load_model
+
+    model = NumpyLSTM.from_keras(load_model(src, compile=False), dtype)
+    model.save(dest)
+    return model
+
+
+def main():
+    from config import BASE_DIR, MODEL_PATH_LSTM, MODEL_PATH_LSTM_NPZ
+
+    parser = argparse.ArgumentParser(description="Export the Keras LSTM to a NumPy .npz for TensorFlow-free serving")
+    parser.add_argument("--src", default=str(BASE_DIR / MODEL_PATH_LSTM))
+    parser.add_argument("--dest", default=str(BASE_DIR / MODEL_PATH_LSTM_NPZ))
+    parser.add_argument("--dtype", choices=STORAGE_DTYPES, default="float32")
+    args = parser.parse_args()
+    export_keras_lstm(args.src, args.dest, args.dtype)
+    print(f"✅ LSTM exported to {args.dest} ({args.dtype} weights)")
+
+
+if __name__ == "__main__":
+    main()
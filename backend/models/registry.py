@@ -0,0 +1,145 @@
+# models/registry.py
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+import joblib
+from config import BASE_DIR, MODEL_PATH_XGB, MODEL_PATH_LSTM, MODEL_PATH_XGB_DIRECT, MODEL_PATH_LSTM_NPZ, LSTM_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Warm, in-process copies of the trained model artifacts.
+# Each entry is replaced as a whole when a new artifact is published, so a request
+# that already holds a model keeps using it while new requests get the new one.
+ARTIFACTS = {
+    "xgboost": BASE_DIR / MODEL_PATH_XGB,
+    "lstm": BASE_DIR / MODEL_PATH_LSTM,
+    "xgboost_direct": BASE_DIR / MODEL_PATH_XGB_DIRECT,
+    "lstm_numpy": BASE_DIR / MODEL_PATH_LSTM_NPZ,
+}
+# The LSTM artifact forecasts run on; the other one is only loaded on demand (training, backtests)
+SERVED_LSTM = "lstm_numpy" if LSTM_BACKEND == "numpy" else "lstm"
+ON_DEMAND = {"lstm", "lstm_numpy"} - {SERVED_LSTM}
+# Served when present, but not needed for readiness (the default forecast paths don't use them)
+OPTIONAL = {"xgboost_direct"} | ON_DEMAND
+
+_lock = threading.Lock()
+_entries = {}  # name -> {"model", "version", "loaded_at"}
+_errors = {}   # name -> last load error
+# One loader at a time per model; requests for other models are not blocked
+_reload_locks = {name: threading.Lock() for name in ARTIFACTS}
+
+
+def _signature(path: Path):
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def _load_artifact(name, path):
+    if name == "lstm":
+        # TensorFlow is only imported once the Keras LSTM is actually needed
+        from tensorflow.keras.models import load_model
+        return load_model(path, compile=False)
+    if name == "lstm_numpy":
+        from models.lstm_numpy import NumpyLSTM
+        return NumpyLSTM.load(path)
+    return joblib.load(path)
+
+
+def _save_artifact(name, model, path):
+    # Written next to the target and renamed over it, so readers never load a partial file
+    tmp = path.with_name(f"{path.stem}.tmp-{uuid.uuid4().hex}{path.suffix}")
+    if name in ("lstm", "lstm_numpy"):
+        model.save(tmp)
+    else:
+        joblib.dump(model, tmp)
+    os.replace(tmp, path)
+
+
+def _swap(name, model, version):
+    with _lock:
+        _entries[name] = {"model": model, "version": version, "loaded_at": time.time()}
+        _errors.pop(name, None)
+    logger.info(f"Model registry: {name} now serving version {version}")
+
+
+def _reload(name):
+    path = ARTIFACTS[name]
+    try:
+        version = _signature(path)
+        model = _load_artifact(name, path)
+    except Exception as e:
+        with _lock:
+            _errors[name] = str(e)
+        logger.error(f"Model registry: failed to load {name} from {path}: {e}")
+        return
+    _swap(name, model, version)
+
+
+def get_model(name: str):
+    """
+    The current in-memory model. Loaded on first use; reloaded only when the artifact on
+    disk changes (e.g. written by a training script running in another process).
+    """
+    path = ARTIFACTS[name]
+    entry = _entries.get(name)
+    try:
+        current = _signature(path)
+    except FileNotFoundError:
+        current = None
+    if entry is None or (current is not None and current != entry["version"]):
+        with _reload_locks[name]:
+            entry = _entries.get(name)
+            if entry is None or (current is not None and current != entry["version"]):
+                _reload(name)
+        entry = _entries.get(name)
+    if entry is None:
+        raise RuntimeError(f"{name} model is not available: {_errors.get(name, 'artifact not found')}")
+    return entry["model"]
+
+
+def artifact_version(name: str):
+    """Version of the artifact on disk (what get_model serves next), or None if there is none."""
+    try:
+        return _signature(ARTIFACTS[name])
+    except FileNotFoundError:
+        return None
+
+
+def publish_model(name: str, model):
+    """Save a newly trained model as the artifact and serve it immediately."""
+    path = ARTIFACTS[name]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _reload_locks[name]:
+        _save_artifact(name, model, path)
+        _swap(name, model, _signature(path))
+    return path
+
+
+def load_models():
+    """Warm every served artifact (called once at startup)."""
+    for name in ARTIFACTS:
+        if name in ON_DEMAND:
+            continue
+        try:
+            get_model(name)
+        except RuntimeError:
+            pass
+
+
+def registry_status() -> dict:
+    """Readiness: ready once every required artifact has been loaded."""
+    with _lock:
+        models = {
+            name: {
+                "loaded": name in _entries,
+                "version": _entries[name]["version"] if name in _entries else None,
+                "loaded_at": _entries[name]["loaded_at"] if name in _entries else None,
+                "error": _errors.get(name),
+            }
+            for name in ARTIFACTS
+        }
+    ready = all(m["loaded"] for name, m in models.items() if name not in OPTIONAL)
+    return {"ready": ready, "models": models}
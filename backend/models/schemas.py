@@ -48,7 +48,8 @@ class FeaturesResponse(BaseModel):
     data: List[FeatureRow] = []
     page: int = 1
     page_size: int = 200
-    total: int = 0
+    total: Optional[int] = 0
+    next_cursor: Optional[str] = None
 
 # -------------------
 # Insights
@@ -1,37 +1,43 @@
 import pandas as pd
 import numpy as np
-import joblib
 import os
 from xgboost import XGBRegressor
-from statsmodels.tsa.arima.model import ARIMA
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense
-from tensorflow.keras.callbacks import EarlyStopping
 from sklearn.preprocessing import MinMaxScaler
-from config import DATA_PATH, MODEL_PATH_XGB, MODEL_PATH_LSTM, TARGET, WINDOW, LSTM_FEATURES
+from data_processing.feature_store import read_features
+from config import TARGET, WINDOW, LSTM_FEATURES, LSTM_EXPORT_DTYPE
+from models.registry import publish_model
+from models.direct import train_direct
+from models.arima_state import refit_all
+from models.lstm_numpy import NumpyLSTM
 
 def train_model(model_name: str):
     print(f"🔁 Retraining model: {model_name}")
-    df = pd.read_csv(DATA_PATH, parse_dates=["date"]).dropna()
+    df = read_features().dropna()
 
     if model_name.lower() == "xgboost":
         X = df.drop(columns=["date", TARGET])
         y = df[TARGET]
         model = XGBRegressor(n_estimators=100, max_depth=5)
         model.fit(X, y)
-        joblib.dump(model, MODEL_PATH_XGB)
+        publish_model("xgboost", model)
         print("✅ XGBoost model retrained and saved.")
+        publish_model("xgboost_direct", train_direct(df))
+        print("✅ XGBoost direct multi-horizon model retrained and saved.")
 
     elif model_name.lower() == "arima":
         try:
-            model = ARIMA(df[TARGET], order=(5, 1, 0))
-            model_fit = model.fit()
-            joblib.dump(model_fit, "models/arima_model.pkl")
-            print("✅ ARIMA model retrained and saved.")
+            # Orders are re-selected and every series refitted; requests then extend these fits with new days
+            fitted = refit_all(df)
+            print(f"✅ ARIMA refitted for {fitted} series and saved.")
         except Exception as e:
             print(f"❌ ARIMA training failed: {e}")
 
     elif model_name.lower() == "lstm":
+        # Imported here so the API process, which imports this module via the scheduler, never loads TensorFlow
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import LSTM, Dense
+        from tensorflow.keras.callbacks import EarlyStopping
+
         missing = [f for f in LSTM_FEATURES if f not in df.columns]
         if missing:
             print(f"❌ Missing features for LSTM: {missing}")
@@ -56,8 +62,9 @@ def train_model(model_name: str):
 
         early_stop = EarlyStopping(monitor="loss", patience=5)
         model.fit(X_seq, y_seq, epochs=50, batch_size=16, verbose=0, callbacks=[early_stop])
-        model.save(MODEL_PATH_LSTM)
-        print("✅ LSTM model retrained and saved.")
+        publish_model("lstm", model)
+        publish_model("lstm_numpy", NumpyLSTM.from_keras(model, LSTM_EXPORT_DTYPE))
+        print("✅ LSTM model retrained and saved (Keras and NumPy export).")
 
     else:
         print(f"⚠️ Unsupported model: {model_name}")
\ No newline at end of file
@@ -4,8 +4,8 @@ import json
 from statsmodels.tsa.arima.model import ARIMA
 from models.evaluate import evaluate
 from models.forecast_store import set_model_output
+from data_processing.feature_store import read_features
 
-DATA_PATH = "data/processed/feature_engineered.csv"
 OUTPUT_PATH = "data/outputs/forecast_arima.csv"
 METRICS_PATH = "data/outputs/model_metrics.json"
 TARGET = "usage_cpu"
@@ -13,7 +13,7 @@ TARGET = "usage_cpu"
 def main():
     print("🚀 Starting ARIMA training...")
 
-    df = pd.read_csv(DATA_PATH, parse_dates=["date"])
+    df = read_features()
     df = df.sort_values("date")
 
     train_size = int(len(df) * 0.8)
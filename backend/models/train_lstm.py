@@ -7,9 +7,12 @@ from tensorflow.keras.layers import LSTM, Dense, Dropout
 import sys
 sys.path.append("C:/Users/Sakshi Singhania/Desktop/milestone2/Project/backend")
 
-from config import DATA_PATH, MODEL_PATH_LSTM, TARGET, WINDOW, LSTM_FEATURES
+from config import TARGET, WINDOW, LSTM_FEATURES, LSTM_EXPORT_DTYPE
 from models.forecast_store import set_model_output
+from models.registry import publish_model
+from models.lstm_numpy import NumpyLSTM
 from models.evaluate import evaluate
+from data_processing.feature_store import read_features
 
 def preprocess(df, features, target):
     df = df.sort_values("date").dropna().reset_index(drop=True)
@@ -37,12 +40,14 @@ def build_model(input_shape):
     return model
 
 def main():
-    df = pd.read_csv(DATA_PATH, parse_dates=["date"])
+    df = read_features()
     X, y, scaler = preprocess(df, LSTM_FEATURES, TARGET)
     model = build_model((WINDOW, len(LSTM_FEATURES)))
     model.fit(X, y, epochs=20, batch_size=32, validation_split=0.2)
-    model.save(MODEL_PATH_LSTM)
-    print(f"✅ LSTM model saved to {MODEL_PATH_LSTM}")
+    model_path = publish_model("lstm", model)
+    print(f"✅ LSTM model saved to {model_path}")
+    npz_path = publish_model("lstm_numpy", NumpyLSTM.from_keras(model, LSTM_EXPORT_DTYPE))
+    print(f"✅ NumPy export saved to {npz_path}")
 
     y_pred = model.predict(X).flatten()
     metrics = evaluate(y, y_pred)
@@ -6,21 +6,22 @@ from xgboost import XGBRegressor
 from sklearn.preprocessing import MinMaxScaler, LabelEncoder
 from models.evaluate import evaluate
 from models.forecast_store import set_model_output
-import joblib
+from models.registry import publish_model
+from models.direct import train_direct
+from data_processing.feature_store import read_features
+from data_processing.schema import model_columns
 
 # --- Paths and Config ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_PATH = os.path.join(BASE_DIR, "../data/processed/feature_engineered.csv")
 OUTPUT_PATH = os.path.join(BASE_DIR, "../data/outputs/forecast_xgboost.csv")
 METRICS_PATH = os.path.join(BASE_DIR, "../data/outputs/model_metrics.json")
-MODEL_PATH = os.path.join(BASE_DIR, "xgboost_model.pkl")
 TARGET = "usage_cpu"
 
 def main():
     print("🚀 Starting XGBoost training...")
 
     # --- Load and split data ---
-    df = pd.read_csv(DATA_PATH, parse_dates=["date"]).sort_values("date")
+    df = read_features().sort_values("date")
     train_size = int(len(df) * 0.8)
     train, test = df[:train_size], df[train_size:]
 
@@ -30,15 +31,15 @@ def main():
     y_test = test[TARGET]
 
     # --- Encode categorical features ---
-    for col in X_train.select_dtypes(include="object").columns:
+    for col in model_columns(X_train):
         le = LabelEncoder()
         X_train[col] = le.fit_transform(X_train[col])
         X_test[col] = le.transform(X_test[col])
 
-    # --- Scale features ---
+    # --- Scale features (kept as frames so the model records its feature names) ---
     scaler = MinMaxScaler()
-    X_train = scaler.fit_transform(X_train)
-    X_test = scaler.transform(X_test)
+    X_train = pd.DataFrame(scaler.fit_transform(X_train), columns=X_train.columns)
+    X_test = pd.DataFrame(scaler.transform(X_test), columns=X_test.columns)
 
     # --- Train model ---
     model = XGBRegressor(n_estimators=100, learning_rate=0.1)
@@ -78,8 +79,12 @@ def main():
     print(f"📊 Metrics saved to {METRICS_PATH}")
 
     # --- Save model ---
-    joblib.dump(model, MODEL_PATH)
-    print(f"💾 Model saved to {MODEL_PATH}")
+    model_path = publish_model("xgboost", model)
+    print(f"💾 Model saved to {model_path}")
+
+    # --- Direct multi-horizon model (horizon as a feature), on the full history ---
+    direct_path = publish_model("xgboost_direct", train_direct(df))
+    print(f"💾 Direct model saved to {direct_path}")
 
     # --- Push to memory for FastAPI ---
     set_model_output(
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, HTTPException
 from typing import Optional
 import pandas as pd
-from data_processing.feature_engineering import load_features
-from models.schemas import FeaturesResponse
-import numpy as np
+from data_processing.feature_store import feature_columns
+from data_processing.dataset import get_dataset, get_index
+from data_processing.feature_index import cursor_page
+from models.schemas import FeaturesResponse, FeatureRow
+from utils.json_utils import FastJSONResponse, frame_records, frame_columns, RESPONSE_FORMATS
+from utils.arrow_utils import arrow_response
 
 router = APIRouter()
 
@@ -14,6 +17,23 @@ RESOURCE_TYPE_TO_METRIC = {
     "Container": "usage_cpu"  # or usage_storage depending on your logic
 }
 
+# Pages are shaped like FeatureRow here instead of being validated row by row by pydantic
+FEATURE_FIELDS = list(FeatureRow.model_fields)
+INT_FIELDS = [name for name, field in FeatureRow.model_fields.items() if field.annotation in (int, Optional[int])]
+
+
+def feature_records(df: pd.DataFrame, columnar: bool = False):
+    """Rows serialised as FeatureRow would: every field present, ISO datetimes, int fields as ints."""
+    page = df.reindex(columns=FEATURE_FIELDS)
+    page["date"] = page["date"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    page["region"] = page["region"].astype(str).str.strip()
+    for col in INT_FIELDS:
+        values = page[col]
+        if pd.api.types.is_float_dtype(values):
+            page[col] = values.astype("Int64").astype(object).where(values.notna(), None)
+    return frame_columns(page) if columnar else frame_records(page)
+
+
 @router.get("/", response_model=FeaturesResponse)
 def get_features(
     page: int = 1,
@@ -23,58 +43,63 @@ def get_features(
     metric: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    format: str = "records",
 ):
+    """format=records (default) | columnar (one array per column) | arrow (Arrow IPC stream)."""
+    if format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}. Use one of {', '.join(RESPONSE_FORMATS)}")
     try:
-        df = load_features()
-
-        # Normalize region
-        if "region" in df.columns:
-            df["region"] = df["region"].astype(str).str.strip()
-
-        # Convert date column to datetime
-        if "date" in df.columns:
-            df["date"] = pd.to_datetime(df["date"], errors="coerce")
-
-        # Apply filters
-        if region:
-            df = df[df["region"].str.lower() == region.lower()]
-        if resource_type:
-            df = df[df["resource_type"] == resource_type]
-
         # Determine metric column
         metric_col = None
         if resource_type:
             metric_col = RESOURCE_TYPE_TO_METRIC.get(resource_type)
-        elif metric and metric in df.columns:
+        elif metric and metric in feature_columns():
             metric_col = metric
 
-        # Select relevant columns
-        if metric_col and metric_col in df.columns:
-            df = df[["date", "region", "resource_type", metric_col]]
-
-        # Date filters
-        if start_date:
-            df = df[df["date"] >= pd.to_datetime(start_date)]
-        if end_date:
-            df = df[df["date"] <= pd.to_datetime(end_date)]
-
-        # Replace NaN/Infinity
-        df = df.replace([float("inf"), float("-inf")], pd.NA)
-        df = df.where(pd.notnull(df), None)
+        # Filters resolve to contiguous slices of the sorted (region, resource_type, date) index
+        columns = ["date", "region", "resource_type", metric_col] if metric_col else None
+        filters = dict(
+            region=region,
+            resource_type=resource_type,
+            start_date=start_date,
+            end_date=end_date,
+            ignore_case=True,
+        )
+        index = get_index()
+
+        # Keyset mode: cursor= (empty) for the first page, then the returned next_cursor
+        next_cursor = None
+        if cursor is not None:
+            try:
+                df, next_cursor = cursor_page(index, cursor, page_size, columns=columns, **filters)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        else:
+            df = index.query(columns=columns, **filters)
 
         # Pagination
-        total = len(df)
-        start = (page - 1) * page_size
-        end = start + page_size
-        data = df.iloc[start:end].replace([np.inf, -np.inf, np.nan], None).to_dict(orient="records")
-
-        return {
-            "data": data,
-            "page": page,
-            "page_size": page_size,
-            "total": total
-        }
-
+        if cursor is not None:
+            total = index.count_cached(**filters) if include_total else None
+            start, end = 0, page_size
+        else:
+            total = len(df)
+            start = (page - 1) * page_size
+            end = start + page_size
+        meta = {"page": page, "page_size": page_size, "total": total, "next_cursor": next_cursor}
+        if format == "arrow":
+            return arrow_response(df.iloc[start:end], meta)
+
+        # Only the page is normalised (region strip, NaN/inf -> null); returning a response
+        # directly skips response_model validation, which is kept for the OpenAPI schema
+        return FastJSONResponse(content={
+            "data": feature_records(df.iloc[start:end], columnar=format == "columnar"),
+            **meta,
+        })
+
+    except HTTPException:
+        raise
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Features file not found")
     except Exception as e:
@@ -84,7 +109,7 @@ def get_features(
 @router.get("/regions")
 def get_regions():
     try:
-        df = load_features()
+        df = get_dataset()
         if "region" not in df.columns:
             return {"regions": []}
 
@@ -100,7 +125,7 @@ def get_regions():
 @router.get("/metrics")
 def get_metrics():
     try:
-        df = load_features()
+        df = get_dataset()
         exclude_cols = {"date", "region", "resource_type", "day_of_week", "month", "quarter", "is_weekend"}
         metrics = sorted([col for col in df.columns if col not in exclude_cols and pd.api.types.is_numeric_dtype(df[col])])
         return {"metrics": metrics}
@@ -114,11 +139,10 @@ def get_metrics():
 @router.get("/date-range")
 def get_date_range():
     try:
-        df = load_features()
+        df = get_dataset()
         if "date" not in df.columns:
             return {"min_date": None, "max_date": None}
 
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
         min_date = df["date"].min().date()
         max_date = df["date"].max().date()
         return {"min_date": min_date, "max_date": max_date}
@@ -1,87 +1,78 @@
 from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
-from models.forecast import forecast, get_valid_combinations
+from utils.json_utils import FastJSONResponse, frame_records, frame_columns, dumps, RESPONSE_FORMATS
+from utils.arrow_utils import arrow_response
+from models.forecast import forecast_frame, stored_forecast, forecast_stream, get_valid_combinations
 from models.monitoring import get_monitoring_status
 from models.capacity import get_capacity_adjustment
 import traceback
+import time
 import numpy as np
 import pandas as pd
 import math
 import json
-from starlette.responses import Response
+from starlette.responses import Response, StreamingResponse
 from fastapi import APIRouter, HTTPException, Query
+from starlette.concurrency import run_in_threadpool
+from utils.model_executor import run_model, run_model_step
 
 router = APIRouter()
 
-def sanitize_dataframe(df: pd.DataFrame) -> pd.DataFrame:
-    import math
-
-    def safe_convert(val):
-        if val is None:
-            return None
-        if isinstance(val, float):
-            if math.isnan(val) or math.isinf(val):
-                return None
-            if abs(val) > 1e308:
-                return float(1e308) if val > 0 else float(-1e308)
-            return float(val)
-        if isinstance(val, (np.float32, np.float64)):
-            return float(val)
-        if isinstance(val, (np.int32, np.int64)):
-            return int(val)
-        return val
-
-    df = df.replace([np.inf, -np.inf], np.nan)
-    df = df.where(pd.notnull(df), None)
-    df = df.astype(object).applymap(safe_convert)
-    return df
-
-def sanitize_record(record):
-    def safe(val):
-        if val is None:
-            return None
-        if isinstance(val, float):
-            if math.isnan(val) or math.isinf(val):
-                return None
-            if abs(val) > 1e308:
-                return float(1e308) if val > 0 else float(-1e308)
-            return float(val)
-        if isinstance(val, (np.float32, np.float64)):
-            return float(val)
-        if isinstance(val, (np.int32, np.int64)):
-            return int(val)
-        return val
-    return {k: safe(v) for k, v in record.items()}
-
 
+async def served_forecast(region, service, model, horizon, strategy, live):
+    """
+    (frame, metrics, source) as models.forecast.served_forecast, without tying up the
+    event loop: store reads use the regular threadpool, model work the bounded model
+    executor, where identical concurrent requests share one computation.
+    """
+    if not live:
+        stored = await run_in_threadpool(stored_forecast, region, service, model, horizon, strategy)
+        if stored is not None:
+            return stored[0], stored[1], "store"
+    key = ("forecast", region, service, model.lower(), horizon, strategy)
+    forecast_df, metrics = await run_model(key, forecast_frame, region, service, model, horizon, strategy)
+    return forecast_df, metrics, "live"
 
 
 @router.get("/api/forecast")
-def get_forecast(
+async def get_forecast(
     region: str,
     service: str,
     model: str = "xgboost",
     horizon: int = 30,
+    strategy: str = "recursive",
+    live: bool = False,
+    format: str = "records",
     #start_date: str = Query(None),
     #end_date: str = Query(None)
 ):
+    """
+    format=records (default): list of row objects.
+    format=columnar: {"forecast": {column: [values]}}, one array per column.
+    format=arrow: Arrow IPC stream; metrics are in the schema metadata.
+    strategy=direct (xgboost only): all future points from the horizon-indexed model in one predict.
+    live=true: compute now instead of answering from the scheduled forecast store.
+    The X-Forecast-Source header says which one answered (store or live).
+    """
+    if format not in RESPONSE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}. Use one of {', '.join(RESPONSE_FORMATS)}")
     try:
-        result = forecast(region, service, model, horizon)
-        df = pd.DataFrame(result["forecast"])
-
-        # Separate historical and future rows
-        historical = df[df["actual"].notna()].copy()
-        future = df[df["actual"].isna() & df["predicted"].notna()].copy()
-
-
-        # Combine and sanitize
-        combined = pd.concat([historical, future], ignore_index=True)
-        records = [sanitize_record(row) for row in combined.to_dict(orient="records")]
-
-        return JSONResponse(content={
-            "forecast": records,
-            "metrics": result["metrics"]
-        })
+        forecast_df, metrics, source = await served_forecast(region, service, model, horizon, strategy, live)
+
+        # Historical rows first, then future rows that have a prediction
+        historical = forecast_df["actual"].notna()
+        future = ~historical & forecast_df["predicted"].notna()
+        forecast_df = pd.concat([forecast_df[historical], forecast_df[future]], ignore_index=True)
+
+        headers = {"X-Forecast-Source": source}
+        if format == "arrow":
+            response = arrow_response(forecast_df, {"metrics": metrics})
+            response.headers.update(headers)
+            return response
+        payload = frame_columns(forecast_df) if format == "columnar" else frame_records(forecast_df)
+        return FastJSONResponse(content={
+            "forecast": payload,
+            "metrics": metrics
+        }, headers=headers)
 
     except HTTPException as e:
         raise e
@@ -90,11 +81,77 @@ def get_forecast(
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Forecast serialization failed.")
 
+STREAM_FORMATS = {"ndjson": "application/x-ndjson", "sse": "text/event-stream"}
+# Seconds of model work per executor round trip: points computed within it are sent together
+STREAM_FLUSH_SECONDS = 0.05
+
+
+def _next_points(points):
+    """The points computed within STREAM_FLUSH_SECONDS (at least one); empty when exhausted."""
+    batch = []
+    deadline = time.perf_counter() + STREAM_FLUSH_SECONDS
+    for point in points:
+        batch.append(point)
+        if time.perf_counter() >= deadline:
+            break
+    return batch
+
+
+def _stream_message(format, event, data):
+    body = dumps({"type": event, **data})
+    if format == "sse":
+        return b"event: " + event.encode() + b"\ndata: " + body + b"\n\n"
+    return body + b"\n"
+
+
+@router.get("/api/forecast/stream")
+async def stream_forecast(
+    region: str,
+    service: str,
+    model: str = "xgboost",
+    horizon: int = 30,
+    strategy: str = "recursive",
+    live: bool = False,
+    format: str = "ndjson",
+):
+    """
+    The forecast as a stream of messages, one JSON object per line (format=ndjson) or per
+    Server-Sent Event (format=sse), each with a "type":
+    - history: {"source", "forecast": [historical rows], "metrics"}, sent first
+    - point: one future row, as soon as a recursive XGBoost/LSTM step produces it
+    - end: {"points"} once the horizon is complete; error: {"detail"} if it fails midway
+    """
+    if format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}. Use one of {', '.join(STREAM_FORMATS)}")
+    # Errors up to and including the historical block are regular HTTP errors
+    historical, metrics, points, source = await run_model_step(
+        forecast_stream, region, service, model, horizon, strategy, live
+    )
+
+    async def messages():
+        yield _stream_message(format, "history", {"source": source, "forecast": frame_records(historical), "metrics": metrics})
+        count = 0
+        try:
+            while batch := await run_model_step(_next_points, points):
+                yield b"".join(_stream_message(format, "point", point) for point in batch)
+                count += len(batch)
+        except Exception as e:
+            print(f"❌ Forecast stream error: {e}")
+            yield _stream_message(format, "error", {"detail": str(getattr(e, "detail", e))})
+            return
+        yield _stream_message(format, "end", {"points": count})
+
+    # identity: keeps GZipMiddleware from buffering the stream into compressed blocks
+    headers = {"X-Forecast-Source": source, "Cache-Control": "no-cache", "Content-Encoding": "identity",
+               "X-Accel-Buffering": "no"}
+    return StreamingResponse(messages(), media_type=STREAM_FORMATS[format], headers=headers)
+
+
 @router.get("/api/features/valid-combinations")
 def valid_combinations():
     try:
         combos = get_valid_combinations()
-        return JSONResponse(content=combos)
+        return FastJSONResponse(content=combos)
     except Exception as e:
         print("Valid Combinations API error:")
         print(traceback.format_exc())
@@ -104,23 +161,24 @@ def valid_combinations():
 def monitoring():
     try:
         status = get_monitoring_status()
-        return JSONResponse(content=status)
+        return FastJSONResponse(content=status)
     except Exception as e:
         print("Monitoring API error:")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Monitoring status failed.")
 
 @router.get("/api/capacity-adjustment")
-def capacity_adjustment(region: str, service: str, model: str = "xgboost", horizon: int = 30):
+async def capacity_adjustment(region: str, service: str, model: str = "xgboost", horizon: int = 30, strategy: str = "recursive"):
     try:
-        result = get_capacity_adjustment(region, service, model, horizon)
-        return JSONResponse(content=result)
+        key = ("capacity", region, service, model.lower(), horizon, strategy)
+        result = await run_model(key, get_capacity_adjustment, region, service, model, horizon, strategy)
+        return FastJSONResponse(content=result)
     except Exception as e:
         print("Capacity Adjustment API error:")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail="Capacity adjustment failed.")
     
 @router.get("/api/forecast/{region}/{service}")
-def get_forecast(region: str, service: str, model: str = "xgboost", horizon: int = 30):
-    result = forecast(region, service, model, horizon)
-    return result  # result is a dict with 'forecast' and 'metrics'
\ No newline at end of file
+async def get_forecast_by_path(region: str, service: str, model: str = "xgboost", horizon: int = 30, strategy: str = "recursive", live: bool = False):
+    forecast_df, metrics, _ = await served_forecast(region, service, model, horizon, strategy, live)
+    return {"forecast": frame_records(forecast_df), "metrics": metrics}
\ No newline at end of file
@@ -1,7 +1,4 @@
 from fastapi import APIRouter
-from models.train_xgboost import main as run_xgb
-from models.train_lstm import main as run_lstm
-from models.train_arima import main as run_arima
 from utils.model_utils import select_best_model
 
 router = APIRouter()
@@ -14,6 +11,10 @@ def compare_models():
 @router.post("/model-comparison/train-all")
 def train_all_models():
     print("🔁 Running train_all_models...")
+    # Imported here: the training scripts pull in TensorFlow, which serving doesn't otherwise need
+    from models.train_xgboost import main as run_xgb
+    from models.train_lstm import main as run_lstm
+    from models.train_arima import main as run_arima
 
     try:
         run_xgb()
@@ -1,9 +1,32 @@
 # routes/monitoring.py
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from models.monitoring import get_monitoring_status
+from models.registry import registry_status
+from models.forecast_cache import cache_stats
+from models.forecast_db import stored_runs
+from utils.model_executor import executor_stats
 
 router = APIRouter()
 
 @router.get("/api/monitoring")
 def monitoring():
-    return get_monitoring_status()
\ No newline at end of file
+    return get_monitoring_status()
+
+@router.get("/api/ready")
+def ready():
+    # 503 until the model artifacts are loaded, so a load balancer holds traffic back while warming
+    status = registry_status()
+    return JSONResponse(content=status, status_code=200 if status["ready"] else 503)
+
+@router.get("/api/forecast-cache")
+def forecast_cache():
+    return cache_stats()
+
+@router.get("/api/forecast-store")
+def forecast_store():
+    return stored_runs()
+
+@router.get("/api/model-executor")
+def model_executor():
+    return executor_stats()
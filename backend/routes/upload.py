@@ -1,34 +1,118 @@
-from fastapi import APIRouter, UploadFile, File
+from fastapi import APIRouter, UploadFile, File, HTTPException
 from pathlib import Path
+import shutil
+import tempfile
+import time
 import pandas as pd
-from config import RAW_DIR
-from data_processing.data_cleaning import load_and_clean_raw
-from data_processing.feature_engineering import create_features
+from config import RAW_DIR, INTERIM_DIR
+from data_processing.data_cleaning import iter_clean_raw_chunks, read_interim, spill_series, iter_series, CHUNK_ROWS
+from data_processing.feature_engineering import create_features_by_series, create_features_incremental
+from utils.memory import PeakRss
 
 router = APIRouter()
 
+COPY_BUFFER_BYTES = 1 << 20
+
 @router.post("/")
-def upload_csv(file: UploadFile = File(...)):
+def upload_csv(file: UploadFile = File(...), incremental: bool = False, chunksize: int = CHUNK_ROWS):
     """
     Uploads a CSV file, cleans it, and generates feature-engineered data.
+    With incremental=true, only rows newer than the stored data are engineered
+    and appended; otherwise the feature set is rebuilt from this file.
+
+    The upload is streamed to disk and cleaned `chunksize` rows at a time into the interim
+    file, so memory is bounded by the chunk size and the longest series, not the file:
+    - a rebuild also spills each chunk into one file per (region, resource_type) series,
+      then engineers and writes the feature set one series at a time. Row order does not
+      matter, and ratios are normalised by the maxima over the whole file.
+    - an incremental upload appends the interim file chunk by chunk, which needs each
+      series to be date-ordered across chunks; out-of-order input is rejected with 400
+      before anything is appended. Rows at or before a series' last stored day are
+      skipped and reported as rows_skipped.
+    peak_memory_mb is this upload's peak resident memory above what the server held when
+    it started (sampled while it runs; uploads running at the same time add to it).
     """
+    if chunksize <= 0:
+        raise HTTPException(status_code=400, detail="chunksize must be positive")
+
     filename = file.filename
     RAW_DIR.mkdir(parents=True, exist_ok=True)
-    
-    # Save uploaded CSV
-    file_path = RAW_DIR / filename
-    with open(file_path, "wb") as f:
-        f.write(file.file.read())
 
-    # Clean and feature engineer
-    df_clean = load_and_clean_raw(filename)
-    df_features = create_features(df_clean)
+    started = time.perf_counter()
+    INTERIM_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        with PeakRss() as memory, tempfile.TemporaryDirectory(dir=INTERIM_DIR, prefix="series-") as spill_dir:
+            spill_dir = Path(spill_dir)
+
+            # Save uploaded CSV in fixed-size blocks
+            file_path = RAW_DIR / filename
+            with open(file_path, "wb") as f:
+                shutil.copyfileobj(file.file, f, COPY_BUFFER_BYTES)
+
+            # Clean chunk by chunk into the interim file (and, for a rebuild, per-series files)
+            rows_read = rows_clean = 0
+            latest = {}  # series -> latest date in earlier chunks
+            maxima = {"usage_cpu": None, "usage_storage": None}
+            float_columns = set()
+            for read, chunk in iter_clean_raw_chunks(filename, chunksize):
+                rows_read += read
+                rows_clean += len(chunk)
+                if chunk.empty:
+                    continue
+                if incremental:
+                    _check_order(chunk, latest)
+                else:
+                    spill_series(chunk, spill_dir)
+                    _track_maxima(chunk, maxima)
+                    float_columns.update(col for col in chunk.columns if pd.api.types.is_float_dtype(chunk[col]))
 
+            # Feature engineer: series by series for a rebuild, chunk by chunk when appending
+            rows = 0
+            if rows_clean and not incremental:
+                rows = create_features_by_series(
+                    iter_series(spill_dir, float_columns, chunksize), maxima["usage_cpu"], maxima["usage_storage"]
+                )
+            elif rows_clean:
+                with read_interim(filename, chunksize) as reader:
+                    for chunk in reader:
+                        rows += len(create_features_incremental(chunk))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    elapsed = time.perf_counter() - started
     return {
         "message": f"{filename} uploaded and processed",
-        "rows": len(df_features)
+        "rows": rows,
+        "rows_read": rows_read,
+        "rows_dropped": rows_read - rows_clean,
+        "rows_skipped": rows_clean - rows,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(rows_read / elapsed, 1) if elapsed else None,
+        "peak_memory_mb": memory.delta_mb,
     }
 
+
+def _track_maxima(chunk, maxima):
+    """Running maxima of the columns ratios are normalised by, over every chunk seen so far."""
+    for col in maxima:
+        if col in chunk.columns:
+            value = chunk[col].max()
+            if pd.notna(value):
+                maxima[col] = float(value) if maxima[col] is None else max(maxima[col], float(value))
+
+
+def _check_order(chunk, latest):
+    """Raise ValueError if a series in chunk has a day not after the latest one of an earlier chunk."""
+    spans = chunk.groupby(["region", "resource_type"], observed=True)["date"].agg(["min", "max"])
+    for key, first in spans["min"].items():
+        if key in latest and first <= latest[key]:
+            raise ValueError(
+                f"Rows for {key[0]} / {key[1]} are not date-ordered across chunks; "
+                "sort the file by date or upload it without incremental=true"
+            )
+    for key, last in spans["max"].items():
+        latest[key] = max(last, latest.get(key, last))
+
 # Optional GET endpoint to guide users
 @router.get("/")
 def upload_csv_get():
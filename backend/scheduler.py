@@ -1,27 +1,104 @@
 from apscheduler.schedulers.background import BackgroundScheduler
-from models.forecast import forecast, get_valid_combinations
-import pandas as pd
-import os
+import time
+from models.forecast import forecast_versions, get_valid_combinations, normalize_forecast, BATCH_MODELS
+from models.forecast_db import publish_forecast
+from models.forecast_jobs import run_forecast_jobs, MIN_ROWS
+from data_processing.dataset import get_index
+from config import DIRECT_HORIZON, STORED_FORECAST_HORIZON
 from models.monitoring import get_monitoring_status
 from models.retraining import update_last_train_date
 from models.train import train_model
 
 
+# (model, strategy) pairs precomputed for every series and served from the forecast store
+SCHEDULED_FORECASTS = [
+    ("xgboost", "recursive"), ("xgboost", "direct"), ("arima", "recursive"), ("ar", "recursive"), ("lstm", "recursive"),
+]
+
+
 def scheduled_forecast():
-    combos = get_valid_combinations()
-    for combo in combos:
-        region = combo["region"]
-        service = combo["resource_type"]
-        for model in ["xgboost", "arima", "lstm"]:
+    started = time.perf_counter()
+    # Versions taken before computing: if the data changes mid-run the stored runs are treated as stale
+    versions = {(model, strategy): forecast_versions(model, strategy) for model, strategy in SCHEDULED_FORECASTS}
+    horizons = {
+        (model, strategy): DIRECT_HORIZON if strategy == "direct" else STORED_FORECAST_HORIZON
+        for model, strategy in SCHEDULED_FORECASTS
+    }
+    # Every series is sliced out of the (cached) dataset once and shipped to the workers
+    index = get_index()
+    series = {
+        (combo["region"], combo["resource_type"]): index.query(region=combo["region"], resource_type=combo["resource_type"])
+        for combo in get_valid_combinations()
+    }
+
+    def publish(key, frame, metrics):
+        region, service, model, strategy = key
+        publish_forecast(region, service, model, strategy, horizons[(model, strategy)],
+                         versions[(model, strategy)], frame, metrics)
+
+    report = []
+    for model, strategy in SCHEDULED_FORECASTS:
+        if model in BATCH_MODELS:
+            report += run_batch_forecasts(series, model, strategy, horizons[(model, strategy)], publish)
+    jobs = [(model, strategy, horizons[(model, strategy)]) for model, strategy in SCHEDULED_FORECASTS
+            if model not in BATCH_MODELS]
+    report += run_forecast_jobs(series, jobs, publish)
+
+    for row in report:
+        region, service, model, strategy = row["key"]
+        label = f"{region}-{service}-{model} ({strategy})"
+        if row["status"] == "ok":
+            print(f"✅ Stored forecast: {label} in {row['seconds']:.2f}s (queued {row['queued_seconds']:.2f}s)")
+        else:
+            print(f"❌ Forecast {row['status']} for {label}: {row.get('error')}")
+    counts = {status: sum(row["status"] == status for row in report) for status in ("ok", "failed", "skipped")}
+    run = {
+        "status": "failed" if counts["failed"] else "completed",
+        "stored": counts["ok"],
+        "failed": counts["failed"],
+        "skipped": counts["skipped"],
+        "seconds": round(time.perf_counter() - started, 1),
+        "report": report,
+    }
+    summary = f"{run['stored']}/{len(report)} stored, {run['failed']} failed, {run['skipped']} skipped in {run['seconds']}s"
+    if run["failed"]:
+        print(f"❌ Scheduled forecasts finished with failures: {summary}")
+    else:
+        print(f"📦 Scheduled forecasts: {summary}")
+    return run
+
+def run_batch_forecasts(series, model, strategy, horizon, on_result):
+    """All series in one batched call in this process; report rows shaped like run_forecast_jobs'."""
+    eligible = {key: frame for key, frame in series.items() if len(frame) >= MIN_ROWS}
+    results, error = {}, None
+    start = time.perf_counter()
+    if eligible:
+        try:
+            results = BATCH_MODELS[model](eligible, horizon)
+        except Exception as e:
+            # One batch covers every series: its failure fails them all, but not the rest of the run
+            error = f"batch {model} failed: {e}"
+    elapsed = time.perf_counter() - start
+    report = []
+    for (region, service), frame in series.items():
+        key = (region, service, model, strategy)
+        if (region, service) not in eligible:
+            report.append({"key": key, "status": "skipped", "error": f"{len(frame)} rows"})
+        elif error:
+            report.append({"key": key, "status": "failed", "error": error})
+        elif (region, service) not in results:
+            report.append({"key": key, "status": "failed", "error": "not enough observations"})
+        else:
+            forecast_df, metrics = results[(region, service)]
             try:
-                result = forecast(region, service, model, horizon=30)
-                df = pd.DataFrame(result["forecast"])
-                filename = f"outputs/forecast_{model}_{region}_{service}.csv"
-                os.makedirs("outputs", exist_ok=True)
-                df.to_csv(filename, index=False)
-                print(f"✅ Saved forecast: {filename}")
+                on_result(key, normalize_forecast(forecast_df), metrics)
             except Exception as e:
-                print(f"❌ Forecast failed for {region}-{service}-{model}: {e}")
+                report.append({"key": key, "status": "failed", "error": str(e)})
+                continue
+            # Model time is shared by the batch: reported per series as its even share
+            report.append({"key": key, "status": "ok", "seconds": round(elapsed / len(results), 3),
+                           "queued_seconds": 0.0})
+    return report
 
 def scheduled_retraining():
     status = get_monitoring_status()
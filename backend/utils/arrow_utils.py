@@ -0,0 +1,27 @@
+# backend/utils/arrow_utils.py
+import json
+import pandas as pd
+import pyarrow as pa
+from fastapi.responses import Response
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+def frame_to_ipc(df: pd.DataFrame, metadata: dict = None) -> bytes:
+    """
+    Arrow IPC stream of df. Values in `metadata` are JSON-encoded into the schema
+    metadata (e.g. metrics, total, next_cursor) so bulk readers get them without a second call.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if metadata:
+        merged = dict(table.schema.metadata or {})
+        merged.update({key.encode(): json.dumps(value).encode() for key, value in metadata.items()})
+        table = table.replace_schema_metadata(merged)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def arrow_response(df: pd.DataFrame, metadata: dict = None) -> Response:
+    return Response(content=frame_to_ipc(df, metadata), media_type=ARROW_STREAM_MEDIA_TYPE)
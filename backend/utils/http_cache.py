@@ -0,0 +1,82 @@
+# backend/utils/http_cache.py
+import hashlib
+from fastapi import Request
+from fastapi.responses import Response
+from config import BASE_DIR, FORECAST_DB
+from data_processing.dataset import dataset_version
+from models.registry import ARTIFACTS
+from models.arima_state import REFIT_MARKER, ORDERS_PATH
+
+OUTPUTS_DIR = BASE_DIR / "data" / "outputs"
+MODEL_ARTIFACTS = list(ARTIFACTS.values())
+MODEL_METRICS_FILE = OUTPUTS_DIR / "model_metrics.json"
+BACKTEST_FILES = [OUTPUTS_DIR / f"backtest_{name}.csv" for name in ["arima", "xgboost", "lstm"]]
+
+
+def _dataset():
+    try:
+        return dataset_version()
+    except FileNotFoundError:
+        return "no-dataset"
+
+
+def _files(paths):
+    return lambda: [f"{p.name}:{p.stat().st_mtime_ns}:{p.stat().st_size}" if p.exists() else f"{p.name}:-" for p in paths]
+
+
+# What each cacheable GET response is derived from. Every source is cheap to
+# check (a cached content hash or file stats), so a revalidation never
+# recomputes the payload.
+ETAG_SOURCES = {
+    "/api/features/regions": [_dataset],
+    "/api/features/metrics": [_dataset],
+    "/api/features/date-range": [_dataset],
+    "/api/insights": [_dataset, _files(BACKTEST_FILES)],
+    "/api/model-metrics": [_files([MODEL_METRICS_FILE])],
+    "/api/forecast": [_dataset, _files(MODEL_ARTIFACTS + [REFIT_MARKER, ORDERS_PATH, FORECAST_DB])],
+}
+
+
+def compute_etag(request: Request):
+    """Weak ETag for the request from its data/model versions, or None if the route is not cached."""
+    sources = ETAG_SOURCES.get(request.url.path.rstrip("/") or "/")
+    if sources is None:
+        return None
+    digest = hashlib.sha1(request.url.path.encode())
+    digest.update(repr(sorted(request.query_params.multi_items())).encode())
+    for source in sources:
+        digest.update(repr(source()).encode())
+    # Weak: the tag identifies the data, not the exact bytes (which vary with compression)
+    return f'W/"{digest.hexdigest()[:32]}"'
+
+
+def matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # Weak comparison, so W/"x" and "x" both match
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+async def conditional_get(request: Request, call_next):
+    """
+    HTTP middleware: answer 304 Not Modified when If-None-Match carries the current ETag
+    (without running the endpoint), otherwise tag successful responses with it.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return await call_next(request)
+    etag = compute_etag(request)
+    if etag is None:
+        return await call_next(request)
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
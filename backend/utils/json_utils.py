@@ -0,0 +1,74 @@
+# backend/utils/json_utils.py
+import numpy as np
+import orjson
+import pandas as pd
+from fastapi.responses import JSONResponse
+
+# Largest magnitude sent to clients; matches the clamp the old per-cell sanitizers applied
+FLOAT_LIMIT = 1e308
+# ?format= values accepted by the data endpoints (arrow = Arrow IPC stream, see utils.arrow_utils)
+RESPONSE_FORMATS = ("records", "columnar", "arrow")
+
+
+def _default(obj):
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content) -> bytes:
+    """orjson encoding: NaN/inf become null, numpy scalars and arrays are encoded natively."""
+    return orjson.dumps(
+        content,
+        default=_default,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def _column_values(series: pd.Series) -> list:
+    if series.dtype == object:
+        # e.g. an "actual" column holding floats for history and None for the horizon
+        series = series.infer_objects()
+    if pd.api.types.is_float_dtype(series.dtype):
+        values = series.to_numpy(dtype=np.float64)
+        missing = ~np.isfinite(values)
+        values = np.clip(values, -FLOAT_LIMIT, FLOAT_LIMIT)
+        if not missing.any():
+            return values.tolist()
+        out = values.astype(object)
+        out[missing] = None
+        return out.tolist()
+    if pd.api.types.is_datetime64_any_dtype(series.dtype):
+        out = series.dt.strftime("%Y-%m-%d").astype(object)
+        return out.where(series.notna(), None).tolist()
+    if series.dtype == object:
+        return series.where(series.notna(), None).tolist()
+    # ints, bools and categoricals (categorical NaN comes back as float nan)
+    out = series.tolist()
+    if isinstance(series.dtype, pd.CategoricalDtype) and series.isna().any():
+        out = [None if v != v else v for v in out]
+    return out
+
+
+def frame_records(df: pd.DataFrame) -> list:
+    """
+    df.to_dict(orient="records") with NaN/inf as None, built column-wise with
+    vectorized masks instead of converting each cell. Dates are sent as YYYY-MM-DD.
+    """
+    columns = [_column_values(df[col]) for col in df.columns]
+    names = list(df.columns)
+    return [dict(zip(names, row)) for row in zip(*columns)]
+
+
+def frame_columns(df: pd.DataFrame) -> dict:
+    """Column-oriented counterpart of frame_records: {column: [values]} with the same NaN handling."""
+    return {col: _column_values(df[col]) for col in df.columns}
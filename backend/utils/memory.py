@@ -0,0 +1,58 @@
+# backend/utils/memory.py
+import os
+import threading
+
+# Peak memory of one operation, for endpoints that report what they cost. A background
+# thread samples the process' resident set size while the operation runs; the peak is
+# reported above the RSS at the start, so memory the server already held is not counted.
+# Other requests running at the same time still share the process and show up in it.
+
+SAMPLE_SECONDS = 0.01
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    """Current resident set size of this process, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PeakRss:
+    """with PeakRss() as peak: ...; then peak.delta_mb is the highest RSS growth seen (None if unsupported)."""
+
+    def __init__(self, interval: float = SAMPLE_SECONDS):
+        self.interval = interval
+        self.start = self.peak = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self._record()
+
+    def _record(self):
+        rss = rss_bytes()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def __enter__(self):
+        self.start = self.peak = rss_bytes()
+        if self.start is not None:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            self._stop.set()
+            self._thread.join()
+            self._record()
+        return False
+
+    @property
+    def delta_mb(self):
+        if self.start is None:
+            return None
+        return round((self.peak - self.start) / 2**20, 2)
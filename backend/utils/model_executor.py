@@ -0,0 +1,41 @@
+# backend/utils/model_executor.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from config import MODEL_EXECUTOR_WORKERS
+
+# CPU-bound model work (ARIMA fits, TensorFlow/XGBoost inference) runs here instead of
+# on FastAPI's shared threadpool, so at most MODEL_EXECUTOR_WORKERS forecasts compute at
+# once and the rest of the API stays responsive. Identical concurrent requests share
+# one computation (single flight).
+
+MODEL_EXECUTOR = ThreadPoolExecutor(max_workers=MODEL_EXECUTOR_WORKERS, thread_name_prefix="model")
+
+_inflight = {}  # key -> asyncio future of the running computation (event loop thread only)
+_stats = {"started": 0, "coalesced": 0}
+
+
+async def run_model(key, fn, *args, **kwargs):
+    """
+    Await fn(*args, **kwargs) on the model executor. While a call with the same key is
+    running, later callers wait for its result instead of starting another.
+    """
+    future = _inflight.get(key)
+    if future is None:
+        future = asyncio.get_running_loop().run_in_executor(MODEL_EXECUTOR, partial(fn, *args, **kwargs))
+        _inflight[key] = future
+        future.add_done_callback(lambda done: _inflight.pop(key, None) if _inflight.get(key) is done else None)
+        _stats["started"] += 1
+    else:
+        _stats["coalesced"] += 1
+    # A caller that goes away must not cancel the run the others are waiting on
+    return await asyncio.shield(future)
+
+
+async def run_model_step(fn, *args, **kwargs):
+    """Await fn(*args, **kwargs) on the model executor, unshared (e.g. one step of a streamed forecast)."""
+    return await asyncio.get_running_loop().run_in_executor(MODEL_EXECUTOR, partial(fn, *args, **kwargs))
+
+
+def executor_stats() -> dict:
+    return {**_stats, "in_flight": len(_inflight), "workers": MODEL_EXECUTOR_WORKERS}
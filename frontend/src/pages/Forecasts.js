@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from "react";
 import ForecastFilters from "../components/filters/ForecastFilters.js";
 import ForecastChart from "../components/charts/ForecastChart.js";
-import { getForecast } from "../services/api.js";
+import { getForecast, streamForecast } from "../services/api.js";
 import { toast } from "react-toastify";
 import HistoricalFilters from "../components/filters/HistoricalFilters.js";
 
@@ -49,27 +49,38 @@ useEffect(() => {
   fetchHistorical();
 }, [historicalRegion, historicalService, historicalModel, historicalHorizon]);
 
-  // Fetch forecast-only data
+  // Fetch forecast-only data, streamed: the chart grows as future points arrive
   useEffect(() => {
+    const controller = new AbortController();
     async function fetchForecast() {
       setLoadingForecast(true);
+      setForecastData([]);
       try {
-        const res = await getForecast({
-          region: forecastRegion,
-          service: forecastService,
-          model: forecastModel,
-          horizon: forecastHorizon,
-        });
-        const forecast = res.filter(row => row.actual === null && row.predicted !== null);
-        setForecastData(forecast);
+        await streamForecast(
+          {
+            region: forecastRegion,
+            service: forecastService,
+            model: forecastModel,
+            horizon: forecastHorizon,
+          },
+          {
+            signal: controller.signal,
+            onHistory: () => setLoadingForecast(false),
+            onPoint: (row) => {
+              if (row.predicted !== null) setForecastData(rows => [...rows, row]);
+            },
+          }
+        );
       } catch (err) {
+        if (controller.signal.aborted) return;
         toast.error("Error fetching forecast");
         setForecastData([]);
       } finally {
-        setLoadingForecast(false);
+        if (!controller.signal.aborted) setLoadingForecast(false);
       }
     }
     fetchForecast();
+    return () => controller.abort();
   }, [forecastRegion, forecastService, forecastModel, forecastHorizon]);
 
   return (
@@ -10,6 +10,33 @@ export const getForecast = async (params) => {
   return response.data.forecast || []; // or response.data if you're using full payload
 };
 
+// Streaming forecast (NDJSON): onHistory(rows, metrics) once, then onPoint(row) for each
+// future point as soon as the backend has computed it
+export const streamForecast = async (params, { onHistory, onPoint, signal } = {}) => {
+  const url = new URL("/api/forecast/stream", API.defaults.baseURL);
+  Object.entries(params).forEach(([key, value]) => url.searchParams.set(key, value));
+  const response = await fetch(url, { signal });
+  if (!response.ok) throw new Error(`Forecast stream failed: ${response.status}`);
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    for (const line of lines) {
+      if (!line) continue;
+      const { type, ...message } = JSON.parse(line);
+      if (type === "history") onHistory?.(message.forecast, message.metrics);
+      else if (type === "point") onPoint?.(message);
+      else if (type === "error") throw new Error(message.detail);
+    }
+  }
+};
+
 
 
 // Monitoring API